@@ -5,13 +5,62 @@ This module contains the fundamental algorithms for generating
 box arrangements and testing their validity.
 """
 
-from typing import List, Tuple, Optional
+import logging
+from functools import lru_cache, wraps
+from math import isqrt
+from typing import Callable, Iterator, List, Tuple, Optional
+import numpy as np
 from models import Box, Pallet
-from utils.geometry import arrangement_fits_in_pallet, ratio_score, calculate_arrangement_area
-from config import TARGET_RATIO
+from utils.geometry import (
+    arrangement_fits_in_pallet, make_fit_checker, ratio_score_vec,
+    calculate_arrangement_area
+)
+from config import TARGET_RATIO, DIMENSION_SCALE
 
+logger = logging.getLogger(__name__)
 
-def generate_candidates(box_count: int) -> List[Tuple[int, int]]:
+# A layout search: (box, box_count, pallet, *args) -> grid or None
+_LayoutSearch = Callable[..., Optional[List[List[str]]]]
+
+
+def _memoize_layout(maxsize: int) -> Callable[[_LayoutSearch], _LayoutSearch]:
+    """
+    Memoize a layout search on the box and pallet dimensions.
+    
+    A search only depends on the fixed-point dimensions, the box count and
+    its remaining arguments, so the same box and pallet searched again (by
+    the auto-optimize sweep, the scaling searches or repeated grid sizes)
+    reuse earlier work. Results are keyed on the fixed-point units, cached
+    as tuples and handed to every caller as a fresh list grid to modify.
+    
+    Args:
+        maxsize: Maximum number of results to keep
+        
+    Returns:
+        Decorator for functions called as search(box, box_count, pallet, *args)
+    """
+    def decorate(search: _LayoutSearch) -> _LayoutSearch:
+        @lru_cache(maxsize=maxsize)
+        def cached(box_units: Tuple[int, int], box_count: int,
+                   pallet_units: Tuple[int, int], args: tuple) -> Optional[Tuple[Tuple[str, ...], ...]]:
+            box = Box(box_units[0] / DIMENSION_SCALE, box_units[1] / DIMENSION_SCALE)
+            pallet = Pallet(pallet_units[0] / DIMENSION_SCALE, pallet_units[1] / DIMENSION_SCALE)
+            result = search(box, box_count, pallet, *args)
+            return None if result is None else tuple(map(tuple, result))
+        
+        @wraps(search)
+        def wrapper(box: Box, box_count: int, pallet: Pallet, *args) -> Optional[List[List[str]]]:
+            result = cached((box.width_units, box.length_units), box_count,
+                            (pallet.width_units, pallet.length_units), args)
+            return None if result is None else [list(row) for row in result]
+        
+        return wrapper
+    
+    return decorate
+
+
+@lru_cache(maxsize=None)
+def generate_candidates(box_count: int) -> Tuple[Tuple[int, int], ...]:
     """
     Generate possible (rows, columns) arrangements that can hold all boxes.
     
@@ -20,28 +69,68 @@ def generate_candidates(box_count: int) -> List[Tuple[int, int]]:
     1. Only arrangements where rows >= columns (height >= width requirement)
     2. Sorted by proximity to the target 6:5 ratio for optimal stability
     
+    Results are memoized per box count, so the returned tuple is shared
+    between callers and must not be mutated.
+    
     Args:
         box_count: Total number of boxes to arrange
         
     Returns:
-        List of (rows, columns) tuples, sorted by preference
+        Tuple of (rows, columns) tuples, sorted by preference
     """
-    candidates = []
-    
-    # Generate all possible factor pairs
-    for i in range(1, box_count + 1):
-        if box_count % i == 0:
-            rows = i
-            columns = box_count // i
-            
-            # Only consider arrangements where rows >= columns (height >= width)
-            if rows >= columns:
-                candidates.append((rows, columns))
+    # Generate factor pairs with rows >= columns (height >= width). Every such
+    # pair has columns <= sqrt(box_count), so only those divisors are visited,
+    # in descending order to keep the candidates ordered by ascending rows.
+    columns = np.arange(isqrt(box_count), 0, -1)
+    columns = columns[box_count % columns == 0]
+    rows = box_count // columns
+    
+    # Sort by proximity to target ratio (6:5). Every pair covers exactly
+    # box_count cells, so the stable sort keeps ties in ascending rows.
+    order = np.argsort(ratio_score_vec(rows, columns), kind='stable')
+    
+    return tuple(zip(rows[order].tolist(), columns[order].tolist()))
+
+
+def screen_grid_candidates(box: Box, pallet: Pallet, min_count: int, max_count: int) -> np.ndarray:
+    """
+    Screen the traditional grid candidates for a whole range of box counts at once.
     
-    # Sort by proximity to target ratio (6:5), then by total area efficiency
-    candidates.sort(key=lambda rc: (ratio_score(rc[0], rc[1]), rc[0] * rc[1]))
+    When rows * columns equals the box count, try_arrangement fills every
+    column with `rows` boxes, rotating only as many as needed to fit the
+    pallet length. Whether that succeeds has a closed form, so all candidate
+    grids in the range are evaluated together with NumPy and only the
+    survivors need to be built and validated.
     
-    return candidates
+    Args:
+        box: Box instance with dimensions
+        pallet: Pallet constraints
+        min_count: Smallest box count in the range
+        max_count: Largest box count in the range
+        
+    Returns:
+        Integer array of shape (k, 3) holding a (box_count, rows, columns)
+        row for every candidate grid that can fit on the pallet
+    """
+    counts = np.arange(min_count, max_count + 1)[:, np.newaxis]
+    columns = np.arange(1, isqrt(max_count) + 1)[np.newaxis, :]
+    
+    # Factor pairs with rows >= columns, as produced by generate_candidates
+    is_candidate = (counts % columns == 0) & (counts >= columns * columns)
+    count_idx, column_idx = np.nonzero(is_candidate)
+    counts = counts[count_idx, 0]
+    columns = columns[0, column_idx]
+    rows = counts // columns
+    
+    # A column fits if it does with every box rotated; any rotated box
+    # widens the column from box.width to box.length. Fixed-point units
+    # keep this in step with the exact checks in try_arrangement.
+    fits_length = rows * box.width_units <= pallet.length_units
+    all_normal = rows * box.length_units <= pallet.length_units
+    column_width = np.where(all_normal, box.width_units, box.length_units)
+    fits_width = columns * column_width <= pallet.width_units
+    
+    return np.column_stack((counts, rows, columns))[fits_length & fits_width]
 
 
 def try_arrangement(rows: int, columns: int, box: Box, box_count: int, pallet: Pallet) -> Optional[List[List[str]]]:
@@ -64,10 +153,31 @@ def try_arrangement(rows: int, columns: int, box: Box, box_count: int, pallet: P
     Returns:
         2D list representing the arrangement, or None if impossible
     """
-    # Initialize grid with empty spaces
-    arrangement = [['O' for _ in range(columns)] for _ in range(rows)]
+    return _arrangement(box, box_count, pallet, rows, columns)
+
+
+@_memoize_layout(maxsize=1024)
+def _arrangement(box: Box, box_count: int, pallet: Pallet, rows: int,
+                 columns: int) -> Optional[List[List[str]]]:
+    """Build the arrangement for try_arrangement (memoized)."""
+    # Read dimensions once as fixed-point units; the column kernel only
+    # works on plain integers, so its height comparisons are exact
+    box_width = box.width_units
+    box_length = box.length_units
+    pallet_length = pallet.length_units
+    
+    # Quick rejection: the boxes are spread so that at least
+    # min(columns, box_count) columns hold a box, and each of those is at
+    # least one box width wide
+    if min(columns, box_count) * box_width > pallet.width_units:
+        return None
     
+    # Plan every column before building anything, so candidates that fail
+    # part-way through never allocate a grid. Each planned column already
+    # fits the pallet length, so only the summed width is left to check
+    column_plan = []
     boxes_placed = 0
+    total_width = 0
     
     for col in range(columns):
         # Calculate how many boxes should go in this column
@@ -76,58 +186,96 @@ def try_arrangement(rows: int, columns: int, box: Box, box_count: int, pallet: P
         boxes_in_col = min(rows, (remaining_boxes + remaining_columns - 1) // remaining_columns)
         
         if boxes_in_col == 0:
+            column_plan.append((0, 0))
             continue  # No more boxes needed
         
-        # Helper function to calculate total height of a column arrangement
-        def column_height(orientations):
-            """Calculate total height for a list of box orientations"""
-            h = 0.0
-            for orientation in orientations:
-                h += box.length if orientation == 'N' else box.width
-            return h
-
-        # Strategy 1: Try all normal orientations first
-        orientations = ['N'] * boxes_in_col
-        
-        # Strategy 2: If that doesn't fit, try rotating boxes from bottom up
-        for rotate_count in range(boxes_in_col + 1):
-            test_orientations = ['N'] * (boxes_in_col - rotate_count) + ['R'] * rotate_count
-            if column_height(test_orientations) <= pallet.length:
-                orientations = test_orientations
-                break
-        else:
-            # Strategy 3: If still doesn't fit, try using fewer boxes with empty spaces
-            for empty_spaces in range(1, rows - boxes_in_col + 1):
-                reduced_boxes = boxes_in_col - empty_spaces
-                if reduced_boxes <= 0:
-                    break
-                    
-                # Try different rotations with fewer boxes
-                for rotate_count in range(reduced_boxes + 1):
-                    test_orientations = ['N'] * (reduced_boxes - rotate_count) + ['R'] * rotate_count
-                    if column_height(test_orientations) <= pallet.length:
-                        orientations = test_orientations + ['O'] * empty_spaces
-                        boxes_in_col = reduced_boxes  # Update actual boxes placed
-                        break
-                else:
-                    continue
-                break
-            else:
-                # Could not fit boxes in this column even with reductions
-                return None
+        column_fit = _fit_column(boxes_in_col, rows, box_width, box_length, pallet_length)
+        if column_fit is None:
+            # Could not fit boxes in this column even with reductions
+            return None
         
-        # Place the determined orientations in the column
-        for i, orientation in enumerate(orientations):
-            if i < rows:  # Safety check
-                arrangement[i][col] = orientation
+        # Box guarantees width <= length, so any rotated box sets the width
+        placed, rotate_count = column_fit
+        total_width += box_length if rotate_count else box_width
+        if total_width > pallet.width_units:
+            return None
+        
+        column_plan.append(column_fit)
+        boxes_placed += placed
+    
+    # Initialize grid with empty spaces and fill in the planned columns:
+    # normal boxes go on top, rotated boxes below them, empty spaces last
+    arrangement = _empty_grid(rows, columns)
+    for col, (boxes_in_col, rotate_count) in enumerate(column_plan):
+        normal_count = boxes_in_col - rotate_count
+        for i in range(normal_count):
+            arrangement[i][col] = 'N'
+        for i in range(normal_count, boxes_in_col):
+            arrangement[i][col] = 'R'
+    
+    return arrangement
+
+
+def _fit_column(boxes_in_col: int, rows: int, box_width: int, box_length: int,
+                pallet_length: int) -> Optional[Tuple[int, int]]:
+    """
+    Work out how a single column can be stacked within the pallet length.
+    
+    Strategies are tried in order:
+    1. All boxes in normal orientation
+    2. Rotate boxes from the bottom up until the column fits
+    3. Use fewer boxes (leaving empty spaces) with the same rotation search
+    
+    Args:
+        boxes_in_col: Number of boxes requested for this column
+        rows: Number of rows in the grid
+        box_width: Shorter box dimension (fixed-point units)
+        box_length: Longer box dimension (fixed-point units)
+        pallet_length: Available column height (fixed-point units)
+    
+    Returns:
+        Tuple of (boxes placed, boxes rotated), or None if the column cannot fit
+    """
+    # Strategies 1 and 2: no rotations is the all-normal column
+    rotate_count = _min_rotations(boxes_in_col, box_width, box_length, pallet_length)
+    if rotate_count is not None:
+        return boxes_in_col, rotate_count
+    
+    # Strategy 3: try using fewer boxes with empty spaces
+    for empty_spaces in range(1, rows - boxes_in_col + 1):
+        reduced_boxes = boxes_in_col - empty_spaces
+        if reduced_boxes <= 0:
+            break
         
-        boxes_placed += boxes_in_col
+        rotate_count = _min_rotations(reduced_boxes, box_width, box_length, pallet_length)
+        if rotate_count is not None:
+            return reduced_boxes, rotate_count
     
-    # Verify the final arrangement fits in the pallet
-    if not arrangement_fits_in_pallet(arrangement, box, pallet):
+    return None
+
+
+def _min_rotations(box_total: int, box_width: int, box_length: int,
+                   pallet_length: int) -> Optional[int]:
+    """
+    Find the fewest rotated boxes that let a column fit within the pallet length.
+    
+    Each rotation shortens the column by (box_length - box_width), so the
+    height falls linearly with the rotation count and the smallest count
+    that fits can be solved for directly.
+    
+    Returns:
+        Number of boxes to rotate, or None if even rotating all of them fails
+    """
+    excess = box_total * box_length - pallet_length
+    if excess <= 0:
+        return 0
+    
+    saving = box_length - box_width
+    if saving <= 0:
         return None
     
-    return arrangement
+    rotate_count = -(-excess // saving)
+    return rotate_count if rotate_count <= box_total else None
 
 
 def find_best_arrangement_with_custom_pallet(box: Box, box_count: int, pallet: Pallet) -> Optional[List[List[str]]]:
@@ -146,24 +294,38 @@ def find_best_arrangement_with_custom_pallet(box: Box, box_count: int, pallet: P
     """
     candidates = generate_candidates(box_count)
     
+    # No arrangement covers less than the boxes themselves, and grids with a
+    # single orientation per column and no gaps reach exactly this area
+    # (converted like calculate_arrangement_area so the two compare exactly)
+    min_area = box_count * box.width_units * box.length_units / DIMENSION_SCALE ** 2
+    
+    # Every column of a candidate grid holds at least one box, so grids with
+    # more columns than fit side by side can be skipped without building them
+    max_columns = pallet.width_units // box.width_units
+    
     best_arrangement = None
-    best_area = float('inf')
-    best_score = float('inf')
+    best_area = None
     
     for rows, columns in candidates:
+        if best_arrangement is not None and best_area <= min_area:
+            break  # Nothing left can have a smaller area
+        
+        if columns > max_columns:
+            continue  # Too wide for the pallet
+        
         arrangement = try_arrangement(rows, columns, box, box_count, pallet)
         if arrangement is None:
             continue  # This arrangement didn't work
             
         # Calculate metrics for this arrangement
         area = calculate_arrangement_area(arrangement, box)
-        score = ratio_score(rows, columns)
         
-        # Prioritize arrangements with smaller area first, then better ratio
-        if area < best_area or (abs(area - best_area) < 1e-6 and score < best_score):
+        # Prioritize arrangements with smaller area first, then better ratio.
+        # Candidates arrive sorted by ratio score, so among equal areas the
+        # one found first already has the best ratio.
+        if best_arrangement is None or area < best_area:
             best_arrangement = arrangement
             best_area = area
-            best_score = score
     
     return best_arrangement
 
@@ -189,15 +351,25 @@ def try_flexible_arrangement(box: Box, box_count: int, pallet: Pallet, max_grid_
     best_arrangement = None
     best_efficiency = 0.0
     
-    print(f"    Trying flexible algorithm with max grid size {max_grid_size}")
+    logger.debug("Trying flexible algorithm with max grid size %s", max_grid_size)
+    
+    # Even using the shorter box side, a column stacks at most max_stack
+    # boxes and at most max_columns columns fit side by side
+    max_stack = pallet.length_units // box.width_units
+    max_columns = pallet.width_units // box.width_units
+    if max_stack == 0 or max_columns == 0:
+        return None  # Not even one box fits
+    
+    # A column holds at most `rows` boxes, so at least ceil(box_count / rows)
+    # columns are used; the bounds below skip every grid that is too small
+    # or needs more columns or a taller column than the pallet allows
+    min_rows = max(1, -(-box_count // max_columns))
+    min_columns = max(1, -(-box_count // max_stack))
     
     # Try different grid sizes - start with reasonable sizes
-    for rows in range(1, min(max_grid_size[0] + 1, 8)):
-        for columns in range(1, min(max_grid_size[1] + 1, 8)):
-            if rows * columns < box_count:
-                continue  # Grid too small
-                
-            print(f"    Trying grid: {rows}x{columns}")
+    for rows in range(min_rows, min(max_grid_size[0] + 1, 8)):
+        for columns in range(max(min_columns, -(-box_count // rows)), min(max_grid_size[1] + 1, 8)):
+            logger.debug("Trying grid: %dx%d", rows, columns)
             
             # Try to place boxes in this grid size
             arrangement = try_flexible_placement(box, box_count, pallet, rows, columns)
@@ -207,17 +379,18 @@ def try_flexible_arrangement(box: Box, box_count: int, pallet: Pallet, max_grid_
                 arrangement_area = calculate_arrangement_area(arrangement, box)
                 efficiency = (box_count * box.area) / arrangement_area if arrangement_area > 0 else 0
                 
-                print(f"    Grid {rows}x{columns}: SUCCESS, efficiency: {efficiency:.3f}")
+                logger.debug("Grid %dx%d: SUCCESS, efficiency: %.3f", rows, columns, efficiency)
                 
                 if efficiency > best_efficiency:
                     best_arrangement = arrangement
                     best_efficiency = efficiency
             else:
-                print(f"    Grid {rows}x{columns}: FAILED")
+                logger.debug("Grid %dx%d: FAILED", rows, columns)
     
     return best_arrangement
 
 
+@_memoize_layout(maxsize=4096)
 def try_flexible_placement(box: Box, box_count: int, pallet: Pallet, rows: int, columns: int) -> Optional[List[List[str]]]:
     """
     Try to place boxes in a grid using flexible placement strategy.
@@ -235,33 +408,11 @@ def try_flexible_placement(box: Box, box_count: int, pallet: Pallet, rows: int,
     Returns:
         2D list representing the arrangement, or None if impossible
     """
-    # Initialize empty grid
-    grid = [['O' for _ in range(columns)] for _ in range(rows)]
-    
     # Try some common placement patterns
-    patterns_to_try = [
-        "fill_normal_first",    # Fill with normal orientation first
-        "fill_rotated_first",   # Fill with rotated orientation first
-        "mixed_columns",        # Alternate column types
-        "mixed_by_space"        # Choose orientation based on available space
-    ]
-    
-    for pattern in patterns_to_try:
-        test_grid = [['O' for _ in range(columns)] for _ in range(rows)]
-        boxes_placed = 0
-        
-        if pattern == "fill_normal_first":
-            # Try to place normal boxes first, then rotated
-            boxes_placed = _place_with_priority(test_grid, box, box_count, 'N', 'R', pallet)
-        elif pattern == "fill_rotated_first":
-            # Try to place rotated boxes first, then normal
-            boxes_placed = _place_with_priority(test_grid, box, box_count, 'R', 'N', pallet)
-        elif pattern == "mixed_columns":
-            # Alternate between normal and rotated columns
-            boxes_placed = _place_mixed_columns(test_grid, box, box_count, pallet)
-        elif pattern == "mixed_by_space":
-            # Choose orientation based on space efficiency
-            boxes_placed = _place_by_space_efficiency(test_grid, box, box_count, pallet)
+    for place, args in _FLEXIBLE_PLACEMENTS:
+        # Each pattern fills its own fresh grid
+        test_grid = _empty_grid(rows, columns)
+        boxes_placed = place(test_grid, box, box_count, *args, pallet)
         
         # Check if this pattern worked
         if boxes_placed >= box_count and arrangement_fits_in_pallet(test_grid, box, pallet):
@@ -273,33 +424,19 @@ def try_flexible_placement(box: Box, box_count: int, pallet: Pallet, rows: int,
 def _place_with_priority(grid: List[List[str]], box: Box, box_count: int, 
                         first_orientation: str, second_orientation: str, pallet: Pallet) -> int:
     """Place boxes with priority to one orientation."""
+    totals = _ColumnTotals(grid, box, pallet)
     boxes_placed = 0
     rows, columns = len(grid), len(grid[0])
     
-    # First pass: try primary orientation
-    for col in range(columns):
-        for row in range(rows):
-            if boxes_placed >= box_count:
-                break
-            if grid[row][col] == 'O':
-                # Try placing with primary orientation
-                test_grid = [row[:] for row in grid]
-                test_grid[row][col] = first_orientation
-                if arrangement_fits_in_pallet(test_grid, box, pallet):
-                    grid[row][col] = first_orientation
-                    boxes_placed += 1
-    
-    # Second pass: try secondary orientation for remaining spaces
-    for col in range(columns):
-        for row in range(rows):
-            if boxes_placed >= box_count:
-                break
-            if grid[row][col] == 'O':
-                # Try placing with secondary orientation
-                test_grid = [row[:] for row in grid]
-                test_grid[row][col] = second_orientation
-                if arrangement_fits_in_pallet(test_grid, box, pallet):
-                    grid[row][col] = second_orientation
+    # First pass: try primary orientation, second pass: secondary orientation
+    # for remaining spaces
+    for orientation in (first_orientation, second_orientation):
+        for col in range(columns):
+            for row in range(rows):
+                if boxes_placed >= box_count:
+                    break
+                if grid[row][col] == 'O' and totals.fits_with(grid, row, col, orientation):
+                    totals.place(grid, row, col, orientation)
                     boxes_placed += 1
     
     return boxes_placed
@@ -307,6 +444,7 @@ def _place_with_priority(grid: List[List[str]], box: Box, box_count: int,
 
 def _place_mixed_columns(grid: List[List[str]], box: Box, box_count: int, pallet: Pallet) -> int:
     """Place boxes alternating column orientations."""
+    totals = _ColumnTotals(grid, box, pallet)
     boxes_placed = 0
     rows, columns = len(grid), len(grid[0])
     
@@ -318,62 +456,71 @@ def _place_mixed_columns(grid: List[List[str]], box: Box, box_count: int, pallet
             if boxes_placed >= box_count:
                 break
                 
-            test_grid = [row[:] for row in grid]
-            test_grid[row][col] = orientation
-            if arrangement_fits_in_pallet(test_grid, box, pallet):
-                grid[row][col] = orientation
-                boxes_placed += 1
-            else:
+            if not totals.fits_with(grid, row, col, orientation):
                 break  # If one box doesn't fit, rest of column won't either
+            
+            totals.place(grid, row, col, orientation)
+            boxes_placed += 1
     
     return boxes_placed
 
 
 def _place_by_space_efficiency(grid: List[List[str]], box: Box, box_count: int, pallet: Pallet) -> int:
     """Place boxes choosing orientation based on space efficiency."""
+    totals = _ColumnTotals(grid, box, pallet)
     boxes_placed = 0
     rows, columns = len(grid), len(grid[0])
+    box_width = box.width
+    box_length = box.length
+    pallet_width = pallet.width
+    
+    # Orientation used whenever both orientations fit the remaining width
+    wide_orientation = 'R' if box_width < box_length else 'N'
+    
+    # Width taken up by the columns filled so far; each column only ever
+    # holds boxes in the one orientation chosen for it
+    consumed_width = 0
     
     for col in range(columns):
         # Calculate remaining width for this column
-        remaining_width = pallet.width - sum(_get_column_width_for_test(grid, c, box) for c in range(col))
+        remaining_width = pallet_width - consumed_width
         
         # Choose orientation based on which fits better in remaining width
-        if remaining_width >= max(box.width, box.length):
+        # (Box guarantees width <= length)
+        if remaining_width >= box_length:
             # Both orientations could fit, choose based on height efficiency
-            orientation = 'R' if box.width < box.length else 'N'
-        elif remaining_width >= box.width:
+            orientation = wide_orientation
+        elif remaining_width >= box_width:
             orientation = 'N'
-        elif remaining_width >= box.length:
-            orientation = 'R'
         else:
             continue  # No room for this column
         
+        column_start = boxes_placed
         for row in range(rows):
             if boxes_placed >= box_count:
                 break
                 
-            test_grid = [row[:] for row in grid]
-            test_grid[row][col] = orientation
-            if arrangement_fits_in_pallet(test_grid, box, pallet):
-                grid[row][col] = orientation
-                boxes_placed += 1
-            else:
+            if not totals.fits_with(grid, row, col, orientation):
                 break  # If one box doesn't fit, rest of column won't either
+            
+            totals.place(grid, row, col, orientation)
+            boxes_placed += 1
+        
+        # Empty columns take up no width
+        if boxes_placed > column_start:
+            consumed_width += box_length if orientation == 'R' else box_width
     
     return boxes_placed
 
 
-def _get_column_width_for_test(grid: List[List[str]], col: int, box: Box) -> float:
-    """Get the width required for a specific column (for testing)."""
-    max_width = 0.0
-    for row in range(len(grid)):
-        cell = grid[row][col]
-        if cell == 'N':
-            max_width = max(max_width, box.width)
-        elif cell == 'R':
-            max_width = max(max_width, box.length)
-    return max_width
+# Placement patterns tried by try_flexible_placement, in order, as
+# (helper, extra arguments passed before the pallet)
+_FLEXIBLE_PLACEMENTS = (
+    (_place_with_priority, ('N', 'R')),   # Fill with normal orientation first
+    (_place_with_priority, ('R', 'N')),   # Fill with rotated orientation first
+    (_place_mixed_columns, ()),           # Alternate column types
+    (_place_by_space_efficiency, ()),     # Choose orientation based on available space
+)
 
 
 def try_smart_patterns(box: Box, box_count: int, pallet: Pallet) -> Optional[List[List[str]]]:
@@ -393,6 +540,18 @@ def try_smart_patterns(box: Box, box_count: int, pallet: Pallet) -> Optional[Lis
     Returns:
         2D list representing the arrangement, or None if no pattern works
     """
+    # Boxes never overlap, so no pattern can work if their combined area
+    # exceeds the pallet; skip probing every pattern in that case
+    if (box_count * box.width_units * box.length_units >
+            pallet.width_units * pallet.length_units):
+        return None
+    
+    return _smart_patterns(box, box_count, pallet)
+
+
+@_memoize_layout(maxsize=1024)
+def _smart_patterns(box: Box, box_count: int, pallet: Pallet) -> Optional[List[List[str]]]:
+    """Run the smart patterns for try_smart_patterns (memoized)."""
     patterns = [
         try_perimeter_fill_pattern,     # NEW: Prioritize perimeter filling
         try_optimal_alternating_pattern,
@@ -404,39 +563,46 @@ def try_smart_patterns(box: Box, box_count: int, pallet: Pallet) -> Optional[Lis
     for pattern_func in patterns:
         result = pattern_func(box, box_count, pallet)
         if result is not None:
-            print(f"    Smart pattern found: {pattern_func.__name__}")
+            logger.debug("Smart pattern found: %s", pattern_func.__name__)
             return result
     
     return None
 
 
+# Column orientation patterns tried by _try_mixed_column_pattern
+_MIXED_COLUMN_PATTERNS = (
+    ('R', 'N', 'N', 'R', 'R'),  # Your exact suggestion
+    ('R', 'N', 'N', 'R'),       # 4 columns
+    ('R', 'N', 'R'),            # 3 columns
+    ('N', 'R', 'N', 'R'),       # Alternating
+    ('R', 'R', 'N', 'N'),       # Grouped
+)
+
+
 def _try_mixed_column_pattern(box: Box, box_count: int, pallet: Pallet) -> Optional[List[List[str]]]:
     """Try a pattern with mixed orientation columns."""
-    # Try patterns like: R-N-N-R-R (your suggested pattern)
-    column_patterns = [
-        ['R', 'N', 'N', 'R', 'R'],  # Your exact suggestion
-        ['R', 'N', 'N', 'R'],       # 4 columns
-        ['R', 'N', 'R'],            # 3 columns
-        ['N', 'R', 'N', 'R'],       # Alternating
-        ['R', 'R', 'N', 'N'],       # Grouped
-    ]
+    # How many boxes of each orientation fit in a column; this only depends
+    # on the dimensions, so work it out once rather than per column
+    boxes_per_orientation = {
+        'N': int(pallet.length // box.length),
+        'R': int(pallet.length // box.width),
+    }
     
-    for col_pattern in column_patterns:
+    # Try patterns like: R-N-N-R-R (your suggested pattern)
+    for col_pattern in _MIXED_COLUMN_PATTERNS:
         # Try different row counts
         for max_rows in range(5, 9):  # Try 5-8 rows
-            grid = [['O' for _ in range(len(col_pattern))] for _ in range(max_rows)]
+            if len(col_pattern) * max_rows < box_count:
+                continue  # Grid too small to possibly fit all boxes
+            
+            grid = _empty_grid(max_rows, len(col_pattern))
             boxes_placed = 0
             
             # Fill the grid according to the column pattern
             for col, orientation in enumerate(col_pattern):
-                # Calculate how many boxes we can fit in this column
-                if orientation == 'N':
-                    boxes_per_col = int(pallet.length // box.length)
-                else:  # 'R'
-                    boxes_per_col = int(pallet.length // box.width)
-                
                 # Place boxes in this column
-                boxes_to_place = min(boxes_per_col, max_rows, box_count - boxes_placed)
+                boxes_to_place = min(boxes_per_orientation[orientation], max_rows,
+                                     box_count - boxes_placed)
                 
                 for row in range(boxes_to_place):
                     grid[row][col] = orientation
@@ -457,97 +623,161 @@ def _try_mixed_column_pattern(box: Box, box_count: int, pallet: Pallet) -> Optio
 
 def _try_block_pattern(box: Box, box_count: int, pallet: Pallet) -> Optional[List[List[str]]]:
     """Try patterns with rectangular blocks of same orientation."""
-    # Try different block arrangements
-    # Block pattern: create blocks of N and R orientations
-    
+    box_width = box.width_units
+    box_length = box.length_units
+    pallet_width = pallet.width_units
+    pallet_length = pallet.length_units
+    
+    # Block pattern: an N block on the left, filled row by row first, and an
+    # R block to its right holding the rest. A block's first column is its
+    # tallest, holding ceil(boxes / block columns) boxes, so whether a layout
+    # fits is known without building it; only the winning grid is built.
     for n_block_rows in range(1, 6):
         for n_block_cols in range(1, 4):
+            normal_boxes = min(box_count, n_block_rows * n_block_cols)
+            normal_width = min(n_block_cols, normal_boxes) * box_width
+            normal_height = -(-normal_boxes // n_block_cols) * box_length
+            
+            if normal_height > pallet_length or normal_width > pallet_width:
+                continue  # The N block alone doesn't fit
+            
+            rotated_boxes = box_count - normal_boxes
+            
+            # The R block's footprint only depends on its column count, so
+            # work out once which column counts fit instead of re-checking
+            # the same layout for every R block height
+            fitting_r_cols = [
+                r_block_cols for r_block_cols in range(1, 4)
+                if (-(-rotated_boxes // r_block_cols) * box_width <= pallet_length and
+                    normal_width + min(r_block_cols, rotated_boxes) * box_length <= pallet_width)
+            ]
+            if not fitting_r_cols:
+                continue
+            
             for r_block_rows in range(1, 6):
-                for r_block_cols in range(1, 4):
+                for r_block_cols in fitting_r_cols:
+                    if r_block_rows * r_block_cols < rotated_boxes:
+                        continue  # Blocks too small to hold all boxes
                     
                     total_cols = n_block_cols + r_block_cols
                     total_rows = max(n_block_rows, r_block_rows)
+                    grid = _empty_grid(total_rows, total_cols)
+                    remaining = box_count
                     
-                    if total_cols > 8 or total_rows > 8:  # Keep reasonable size
-                        continue
+                    # Fill N block row by row until all boxes are placed
+                    for row in range(n_block_rows):
+                        placed = min(n_block_cols, remaining)
+                        grid[row][:placed] = ['N'] * placed
+                        remaining -= placed
                     
-                    grid = [['O' for _ in range(total_cols)] for _ in range(total_rows)]
-                    boxes_placed = 0
+                    # Fill R block to the right of it with the rest
+                    for row in range(r_block_rows):
+                        placed = min(r_block_cols, remaining)
+                        grid[row][n_block_cols:n_block_cols + placed] = ['R'] * placed
+                        remaining -= placed
                     
-                    # Fill N block
-                    for row in range(min(n_block_rows, total_rows)):
-                        for col in range(n_block_cols):
-                            if boxes_placed < box_count:
-                                grid[row][col] = 'N'
-                                boxes_placed += 1
-                    
-                    # Fill R block
-                    for row in range(min(r_block_rows, total_rows)):
-                        for col in range(n_block_cols, min(total_cols, n_block_cols + r_block_cols)):
-                            if boxes_placed < box_count:
-                                grid[row][col] = 'R'
-                                boxes_placed += 1
-                    
-                    # Check if this arrangement works
-                    if boxes_placed >= box_count and arrangement_fits_in_pallet(grid, box, pallet):
-                        return grid
+                    return grid
     
     return None
 
 
 def _try_optimized_fill_pattern(box: Box, box_count: int, pallet: Pallet) -> Optional[List[List[str]]]:
     """Try an optimized fill pattern that maximizes space usage."""
-    # Calculate how many boxes of each orientation we could theoretically fit
-    normal_width = box.width
-    normal_height = box.length
-    rotated_width = box.length
-    rotated_height = box.width
+    box_width = box.width_units
+    fits = make_fit_checker(box, pallet)
+    
+    # Grid shapes that can hold every box. Each used column is at least one
+    # box width wide and the first column holds ceil(box_count / cols)
+    # boxes that are each at least one box width tall, so shapes failing
+    # either bound are dropped once for all ratios
+    shapes = [
+        (rows, cols)
+        for rows in range(4, 9)
+        for cols in range(3, 8)
+        if rows * cols >= box_count
+        and min(cols, box_count) * box_width <= pallet.width_units
+        and -(-box_count // cols) * box_width <= pallet.length_units
+    ]
+    if not shapes:
+        return None
+    
+    tried = set()
     
     # Try different mixes of orientations
     for normal_ratio in [0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8]:
         target_normal = int(box_count * normal_ratio)
         target_rotated = box_count - target_normal
         
-        # Try to arrange these in a grid
-        for rows in range(4, 9):
-            for cols in range(3, 8):
-                if rows * cols < box_count:
-                    continue
-                
-                grid = [['O' for _ in range(cols)] for _ in range(rows)]
-                boxes_placed = 0
-                normal_placed = 0
-                rotated_placed = 0
-                
-                # Fill grid with preferred ratio
-                for row in range(rows):
-                    for col in range(cols):
-                        if boxes_placed >= box_count:
-                            break
-                        
-                        # Decide orientation based on targets
-                        if normal_placed < target_normal and (rotated_placed >= target_rotated or 
-                                                             normal_placed / max(1, normal_placed + rotated_placed) < normal_ratio):
-                            grid[row][col] = 'N'
-                            normal_placed += 1
-                        elif rotated_placed < target_rotated:
-                            grid[row][col] = 'R'
-                            rotated_placed += 1
-                        else:
-                            break
-                        
-                        boxes_placed += 1
-                    
-                    if boxes_placed >= box_count:
-                        break
-                
-                # Check if this arrangement works
-                if boxes_placed >= box_count and arrangement_fits_in_pallet(grid, box, pallet):
-                    return grid
+        # The orientation chosen for each box only depends on how many of
+        # each have been placed so far, so the fill order is the same for
+        # every grid shape and is laid out row by row
+        sequence = []
+        normal_placed = 0
+        rotated_placed = 0
+        for _ in range(box_count):
+            if normal_placed < target_normal and (rotated_placed >= target_rotated or 
+                                                 normal_placed / max(1, normal_placed + rotated_placed) < normal_ratio):
+                sequence.append('N')
+                normal_placed += 1
+            else:
+                sequence.append('R')
+                rotated_placed += 1
+        
+        # Neighbouring ratios can round to the same fill order, which has
+        # already failed for every shape
+        key = tuple(sequence)
+        if key in tried:
+            continue
+        tried.add(key)
+        
+        for rows, cols in shapes:
+            cells = sequence + ['O'] * (rows * cols - box_count)
+            grid = [cells[start:start + cols] for start in range(0, rows * cols, cols)]
+            
+            # Check if this arrangement works
+            if fits(grid):
+                return grid
     
     return None
 
 
+# Alternating and mixed column patterns tried by try_optimal_alternating_pattern
+_ALTERNATING_PATTERNS = (
+    # Alternating patterns
+    ('R', 'N', 'R', 'N', 'R'),     # 3R + 2N
+    ('N', 'R', 'N', 'R', 'N'),     # 3N + 2R  
+    ('R', 'N', 'R', 'N'),          # 2R + 2N
+    ('N', 'R', 'N', 'R'),          # 2N + 2R
+    ('R', 'N', 'R'),               # 2R + 1N
+    ('N', 'R', 'N'),               # 2N + 1R
+    ('R', 'R', 'N', 'N'),          # 2R + 2N grouped
+    ('N', 'N', 'R', 'R'),          # 2N + 2R grouped
+    
+    # More complex patterns
+    ('R', 'R', 'N', 'R'),          # 3R + 1N mixed
+    ('N', 'R', 'R', 'N'),          # 2R + 2N mixed
+    ('R', 'N', 'N', 'R'),          # 2R + 2N mixed
+    ('R', 'N', 'R', 'R'),          # 3R + 1N
+    ('N', 'R', 'N', 'N'),          # 3N + 1R
+    
+    # Wider patterns
+    ('R', 'N', 'R', 'N', 'R', 'N'),   # 6 columns
+    ('R', 'R', 'N', 'N', 'R', 'R'),   # 6 columns grouped
+    ('N', 'R', 'N', 'R', 'N', 'R'),   # 6 columns alternating
+    
+    # Compact patterns
+    ('R', 'R'),                    # 2R only
+    ('N', 'N'),                    # 2N only
+    ('R', 'N'),                    # 1R + 1N
+    ('N', 'R'),                    # 1N + 1R
+)
+
+# (rotated, normal) column counts of each entry in _ALTERNATING_PATTERNS
+_ALTERNATING_PATTERN_COUNTS = np.array(
+    [(pattern.count('R'), pattern.count('N')) for pattern in _ALTERNATING_PATTERNS]
+)
+
+
 def try_optimal_alternating_pattern(box: Box, box_count: int, pallet: Pallet) -> Optional[List[List[str]]]:
     """
     Try the optimal alternating R-N pattern that maximizes standard pallet usage.
@@ -559,63 +789,35 @@ def try_optimal_alternating_pattern(box: Box, box_count: int, pallet: Pallet) ->
     max_r_per_column = int(pallet.length // box.width)  # Rotated: width becomes height
     max_n_per_column = int(pallet.length // box.length)  # Normal: length becomes height
     
-    print(f"    Max R boxes per column: {max_r_per_column}")
-    print(f"    Max N boxes per column: {max_n_per_column}")
-    
-    # Try many different alternating and mixed patterns
-    patterns_to_try = [
-        # Alternating patterns
-        ['R', 'N', 'R', 'N', 'R'],     # 3R + 2N
-        ['N', 'R', 'N', 'R', 'N'],     # 3N + 2R  
-        ['R', 'N', 'R', 'N'],          # 2R + 2N
-        ['N', 'R', 'N', 'R'],          # 2N + 2R
-        ['R', 'N', 'R'],               # 2R + 1N
-        ['N', 'R', 'N'],               # 2N + 1R
-        ['R', 'R', 'N', 'N'],          # 2R + 2N grouped
-        ['N', 'N', 'R', 'R'],          # 2N + 2R grouped
-        
-        # More complex patterns
-        ['R', 'R', 'N', 'R'],          # 3R + 1N mixed
-        ['N', 'R', 'R', 'N'],          # 2R + 2N mixed
-        ['R', 'N', 'N', 'R'],          # 2R + 2N mixed
-        ['R', 'N', 'R', 'R'],          # 3R + 1N
-        ['N', 'R', 'N', 'N'],          # 3N + 1R
-        
-        # Wider patterns
-        ['R', 'N', 'R', 'N', 'R', 'N'],   # 6 columns
-        ['R', 'R', 'N', 'N', 'R', 'R'],   # 6 columns grouped
-        ['N', 'R', 'N', 'R', 'N', 'R'],   # 6 columns alternating
-        
-        # Compact patterns
-        ['R', 'R'],                    # 2R only
-        ['N', 'N'],                    # 2N only
-        ['R', 'N'],                    # 1R + 1N
-        ['N', 'R'],                    # 1N + 1R
-    ]
+    logger.debug("Max R boxes per column: %d", max_r_per_column)
+    logger.debug("Max N boxes per column: %d", max_n_per_column)
     
     best_arrangement = None
     best_boxes_placed = 0
     best_area_efficiency = 0
+    max_rows = max(max_r_per_column, max_n_per_column)
     
-    for pattern in patterns_to_try:
-        # Calculate if this pattern fits in width
-        total_width = sum(box.length if orient == 'R' else box.width for orient in pattern)
+    # Width and capacity only depend on how many rotated and normal columns
+    # a pattern has, so evaluate every pattern at once (widths in
+    # fixed-point units, as in the fit checks) and skip the too-wide ones
+    pattern_widths = _ALTERNATING_PATTERN_COUNTS @ np.array([box.length_units, box.width_units])
+    pattern_capacities = _ALTERNATING_PATTERN_COUNTS @ np.array([max_r_per_column, max_n_per_column])
+    
+    for index in np.flatnonzero(pattern_widths <= pallet.width_units).tolist():
+        pattern = _ALTERNATING_PATTERNS[index]
+        total_width = pattern_widths[index] / DIMENSION_SCALE
         
-        if total_width > pallet.width:
-            continue  # Pattern too wide
-            
-        print(f"    Trying pattern {pattern}, width: {total_width:.1f}")
+        logger.debug("Trying pattern %s, width: %.1f", pattern, total_width)
         
         # Calculate total boxes this pattern can hold
-        total_boxes_possible = sum(max_r_per_column if orient == 'R' else max_n_per_column for orient in pattern)
+        total_boxes_possible = int(pattern_capacities[index])
         
         if total_boxes_possible < box_count:
-            print(f"      Not enough capacity: {total_boxes_possible} < {box_count}")
+            logger.debug("Not enough capacity: %d < %d", total_boxes_possible, box_count)
             continue  # Not enough capacity
             
         # Create the grid
-        max_rows = max(max_r_per_column, max_n_per_column)
-        grid = [['O' for _ in range(len(pattern))] for _ in range(max_rows)]
+        grid = _empty_grid(max_rows, len(pattern))
         
         boxes_placed = 0
         
@@ -640,7 +842,7 @@ def try_optimal_alternating_pattern(box: Box, box_count: int, pallet: Pallet) ->
             arrangement_area = calculate_arrangement_area(grid, box)
             area_efficiency = (boxes_placed * box.area) / arrangement_area
             
-            print(f"      SUCCESS: {boxes_placed} boxes placed, area efficiency: {area_efficiency:.3f}")
+            logger.debug("SUCCESS: %d boxes placed, area efficiency: %.3f", boxes_placed, area_efficiency)
             
             # Prefer arrangements with more boxes or better area efficiency
             if (boxes_placed > best_boxes_placed or 
@@ -648,12 +850,12 @@ def try_optimal_alternating_pattern(box: Box, box_count: int, pallet: Pallet) ->
                 best_arrangement = grid
                 best_boxes_placed = boxes_placed
                 best_area_efficiency = area_efficiency
-                print(f"      NEW BEST: {boxes_placed} boxes, efficiency: {area_efficiency:.3f}")
+                logger.debug("NEW BEST: %d boxes, efficiency: %.3f", boxes_placed, area_efficiency)
         else:
             if boxes_placed >= box_count:
-                print(f"      FAILED: doesn't fit in pallet")
+                logger.debug("FAILED: doesn't fit in pallet")
             else:
-                print(f"      FAILED: only placed {boxes_placed} boxes")
+                logger.debug("FAILED: only placed %d boxes", boxes_placed)
     
     return best_arrangement
 
@@ -677,9 +879,9 @@ def try_perimeter_fill_pattern(box: Box, box_count: int, pallet: Pallet) -> Opti
     max_r_per_column = int(pallet.length // box.width)  # Rotated
     max_n_per_column = int(pallet.length // box.length)  # Normal
     
-    print(f"    Trying perimeter-fill patterns")
-    print(f"    Max R boxes per column: {max_r_per_column}")
-    print(f"    Max N boxes per column: {max_n_per_column}")
+    logger.debug("Trying perimeter-fill patterns")
+    logger.debug("Max R boxes per column: %d", max_r_per_column)
+    logger.debug("Max N boxes per column: %d", max_n_per_column)
     
     # Try different grid sizes that could accommodate the boxes
     for total_rows in range(5, 9):  # Try 5-8 rows
@@ -693,7 +895,7 @@ def try_perimeter_fill_pattern(box: Box, box_count: int, pallet: Pallet) -> Opti
             
             for pattern_grid in patterns:
                 if _count_boxes_in_pattern(pattern_grid) >= box_count and arrangement_fits_in_pallet(pattern_grid, box, pallet):
-                    print(f"    SUCCESS: Found perimeter pattern {total_rows}x{total_cols}")
+                    logger.debug("SUCCESS: Found perimeter pattern %dx%d", total_rows, total_cols)
                     return pattern_grid
     
     return None
@@ -704,7 +906,8 @@ def _generate_perimeter_patterns(rows: int, cols: int, box: Box, box_count: int,
     patterns = []
     
     # Pattern 1: Fill outer perimeter, leave center empty
-    pattern1 = [['O' for _ in range(cols)] for _ in range(rows)]
+    pattern1 = _empty_grid(rows, cols)
+    totals = _ColumnTotals(pattern1, box, pallet)
     boxes_placed = 0
     
     # Fill top and bottom rows
@@ -712,39 +915,36 @@ def _generate_perimeter_patterns(rows: int, cols: int, box: Box, box_count: int,
         for row in [0, rows-1]:
             if boxes_placed < box_count:
                 # Choose orientation based on space efficiency
-                orientation = _choose_optimal_orientation(row, col, pattern1, box, pallet)
+                orientation = _choose_optimal_orientation(row, col, pattern1, totals)
                 if orientation:
-                    pattern1[row][col] = orientation
+                    totals.place(pattern1, row, col, orientation)
                     boxes_placed += 1
     
     # Fill left and right columns (excluding corners already filled)
     for row in range(1, rows-1):
         for col in [0, cols-1]:
             if boxes_placed < box_count:
-                orientation = _choose_optimal_orientation(row, col, pattern1, box, pallet)
+                orientation = _choose_optimal_orientation(row, col, pattern1, totals)
                 if orientation:
-                    pattern1[row][col] = orientation
+                    totals.place(pattern1, row, col, orientation)
                     boxes_placed += 1
     
     # If we still need more boxes, fill some interior positions strategically
     if boxes_placed < box_count:
         # Fill from outside inward
         for layer in range(1, min(rows//2, cols//2)):
-            for row in range(layer, rows-layer):
-                for col in range(layer, cols-layer):
-                    if (row == layer or row == rows-layer-1 or 
-                        col == layer or col == cols-layer-1):
-                        if pattern1[row][col] == 'O' and boxes_placed < box_count:
-                            orientation = _choose_optimal_orientation(row, col, pattern1, box, pallet)
-                            if orientation:
-                                pattern1[row][col] = orientation
-                                boxes_placed += 1
+            for row, col in _ring_cells(rows, cols, layer):
+                if pattern1[row][col] == 'O' and boxes_placed < box_count:
+                    orientation = _choose_optimal_orientation(row, col, pattern1, totals)
+                    if orientation:
+                        totals.place(pattern1, row, col, orientation)
+                        boxes_placed += 1
     
     if boxes_placed >= box_count:
         patterns.append(pattern1)
     
     # Pattern 2: Corner emphasis with mixed orientations
-    pattern2 = [['O' for _ in range(cols)] for _ in range(rows)]
+    pattern2 = _empty_grid(rows, cols)
     boxes_placed = 0
     
     # Place rotated boxes at corners for stability
@@ -755,20 +955,19 @@ def _generate_perimeter_patterns(rows: int, cols: int, box: Box, box_count: int,
             boxes_placed += 1
     
     # Fill edges with normal orientation
-    for row in range(rows):
-        for col in range(cols):
-            if (row == 0 or row == rows-1 or col == 0 or col == cols-1) and pattern2[row][col] == 'O':
-                if boxes_placed < box_count:
-                    pattern2[row][col] = 'N'
-                    boxes_placed += 1
+    for row, col in _ring_cells(rows, cols, 0):
+        if pattern2[row][col] == 'O' and boxes_placed < box_count:
+            pattern2[row][col] = 'N'
+            boxes_placed += 1
     
     # Fill interior if needed
+    totals = _ColumnTotals(pattern2, box, pallet)
     for row in range(1, rows-1):
         for col in range(1, cols-1):
             if pattern2[row][col] == 'O' and boxes_placed < box_count:
-                orientation = _choose_optimal_orientation(row, col, pattern2, box, pallet)
+                orientation = _choose_optimal_orientation(row, col, pattern2, totals)
                 if orientation:
-                    pattern2[row][col] = orientation
+                    totals.place(pattern2, row, col, orientation)
                     boxes_placed += 1
     
     if boxes_placed >= box_count:
@@ -777,17 +976,123 @@ def _generate_perimeter_patterns(rows: int, cols: int, box: Box, box_count: int,
     return patterns
 
 
-def _choose_optimal_orientation(row: int, col: int, grid: List[List[str]], box: Box, pallet: Pallet) -> Optional[str]:
+def _ring_cells(rows: int, cols: int, layer: int) -> Iterator[Tuple[int, int]]:
+    """
+    Yield the cells of one rectangular ring of a grid in row-major order.
+    
+    Layer 0 is the outer edge of the grid, layer 1 the ring just inside
+    it, and so on. Only the ring itself is visited, instead of scanning
+    the whole enclosed area for cells that lie on it.
+    """
+    last_row = rows - layer - 1
+    last_col = cols - layer - 1
+    
+    for row in range(layer, last_row + 1):
+        if row == layer or row == last_row:
+            for col in range(layer, last_col + 1):
+                yield row, col
+        else:
+            yield row, layer
+            if last_col != layer:
+                yield row, last_col
+
+
+class _ColumnTotals:
+    """
+    Running per-column totals of a grid for constant-time fit checks.
+    
+    Arrangements are reduced column by column, so the orientation counts
+    of each column, the summed column widths and the number of columns
+    taller than the pallet decide whether the grid fits. Changing one cell
+    only touches its own column, so a placement can be tested and applied
+    without rescanning the grid.
+    """
+    
+    __slots__ = ('box_width', 'box_length', 'pallet_width', 'pallet_length',
+                 'normal', 'rotated', 'total_width', 'overfull')
+    
+    def __init__(self, grid: List[List[str]], box: Box, pallet: Pallet):
+        """
+        Tally the columns of an existing grid.
+        
+        Args:
+            grid: 2D grid of box orientations, changed only through place()
+            box: Box instance with dimensions
+            pallet: Pallet constraints
+        """
+        self.box_width = box.width_units
+        self.box_length = box.length_units
+        self.pallet_width = pallet.width_units
+        self.pallet_length = pallet.length_units
+        
+        columns = list(zip(*grid))
+        self.normal = [column.count('N') for column in columns]
+        self.rotated = [column.count('R') for column in columns]
+        self.total_width = 0
+        self.overfull = 0
+        for normal, rotated in zip(self.normal, self.rotated):
+            self.total_width += self._width(normal, rotated)
+            self.overfull += self._height(normal, rotated) > self.pallet_length
+    
+    def _width(self, normal: int, rotated: int) -> int:
+        """Column width in fixed-point units (Box guarantees width <= length)."""
+        if rotated:
+            return self.box_length
+        return self.box_width if normal else 0
+    
+    def _height(self, normal: int, rotated: int) -> int:
+        """Column height in fixed-point units."""
+        return normal * self.box_length + rotated * self.box_width
+    
+    def _replace(self, col: int, previous: str, orientation: str) -> Tuple[int, int]:
+        """Orientation counts of a column after replacing one of its cells."""
+        normal = self.normal[col] + (orientation == 'N') - (previous == 'N')
+        rotated = self.rotated[col] + (orientation == 'R') - (previous == 'R')
+        return normal, rotated
+    
+    def fits_with(self, grid: List[List[str]], row: int, col: int, orientation: str) -> bool:
+        """Check whether the grid would fit the pallet with one cell changed."""
+        normal, rotated = self._replace(col, grid[row][col], orientation)
+        old_normal, old_rotated = self.normal[col], self.rotated[col]
+        
+        total_width = (self.total_width - self._width(old_normal, old_rotated) +
+                       self._width(normal, rotated))
+        overfull = (self.overfull -
+                    (self._height(old_normal, old_rotated) > self.pallet_length) +
+                    (self._height(normal, rotated) > self.pallet_length))
+        
+        return total_width <= self.pallet_width and overfull == 0
+    
+    def place(self, grid: List[List[str]], row: int, col: int, orientation: str) -> None:
+        """Set one cell of the grid and update the column totals to match."""
+        normal, rotated = self._replace(col, grid[row][col], orientation)
+        old_normal, old_rotated = self.normal[col], self.rotated[col]
+        
+        self.total_width += self._width(normal, rotated) - self._width(old_normal, old_rotated)
+        self.overfull += ((self._height(normal, rotated) > self.pallet_length) -
+                          (self._height(old_normal, old_rotated) > self.pallet_length))
+        self.normal[col] = normal
+        self.rotated[col] = rotated
+        grid[row][col] = orientation
+
+
+def _choose_optimal_orientation(row: int, col: int, grid: List[List[str]],
+                                totals: _ColumnTotals) -> Optional[str]:
     """Choose the best orientation for a box at a specific position."""
     # Try both orientations and see which fits better
-    for orientation in ['N', 'R']:
-        test_grid = [row[:] for row in grid]
-        test_grid[row][col] = orientation
-        if arrangement_fits_in_pallet(test_grid, box, pallet):
+    for orientation in ('N', 'R'):
+        if totals.fits_with(grid, row, col, orientation):
             return orientation
     return None
 
 
 def _count_boxes_in_pattern(pattern: List[List[str]]) -> int:
     """Count the number of boxes in a pattern."""
-    return sum(row.count('N') + row.count('R') for row in pattern)
+    # Join the cells once so both counts are single C-level string scans
+    cells = ''.join(map(''.join, pattern))
+    return cells.count('N') + cells.count('R')
+
+
+def _empty_grid(rows: int, cols: int) -> List[List[str]]:
+    """Create a rows x cols grid of empty spaces with independent rows."""
+    return [['O'] * cols for _ in range(rows)]
@@ -5,13 +5,18 @@ This module contains algorithms for finding optimal arrangements
 and automatically determining the best number of boxes per layer.
 """
 
-from typing import Tuple, List
+import logging
+from typing import Tuple, List, Optional
+import numpy as np
 from models import Box, Pallet
-from .arrangement import generate_candidates, try_arrangement, find_best_arrangement_with_custom_pallet, try_flexible_arrangement, try_smart_patterns
+from .arrangement import generate_candidates, try_arrangement, find_best_arrangement_with_custom_pallet, try_flexible_arrangement, try_smart_patterns, screen_grid_candidates
 from .scaling import find_best_arrangement_with_scaling, find_best_arrangement_fine_scaling
-from utils.geometry import calculate_arrangement_area, ratio_score
+from utils.display import print_box_info, print_program_header
+from utils.geometry import calculate_arrangement_area, calculate_area_efficiency, ratio_score
 from config import PALLET_WIDTH, PALLET_LENGTH
 
+logger = logging.getLogger(__name__)
+
 
 def find_best_arrangement(box: Box, box_count: int) -> Tuple[List[List[str]], int, int, Pallet]:
     """
@@ -35,8 +40,6 @@ def find_best_arrangement(box: Box, box_count: int) -> Tuple[List[List[str]], in
         
     Note: May return scaled pallet if standard size insufficient
     """
-    from utils.display import print_box_info, print_program_header
-    
     print_box_info(box, box_count)
     print_program_header()
     
@@ -54,17 +57,27 @@ def find_best_arrangement(box: Box, box_count: int) -> Tuple[List[List[str]], in
     print("Trying smart patterns...")
     smart_arrangement = try_smart_patterns(box, box_count, standard_pallet)
     
-    # Compare all arrangements and pick the best
-    candidates_to_compare = []
+    # Compare all arrangements and keep the best (flexible wins ties)
+    best_name = None
+    best_arrangement = None
+    best_area = None
+    best_score = None
+    best_rows = 0
+    best_columns = 0
     
     if flexible_arrangement is not None:
         flexible_area = calculate_arrangement_area(flexible_arrangement, box)
         flexible_rows = len(flexible_arrangement)
         flexible_columns = len(flexible_arrangement[0]) if flexible_rows > 0 else 0
         flexible_ratio_score = ratio_score(flexible_rows, flexible_columns)
-        area_efficiency = min(flexible_area / standard_pallet.area, standard_pallet.area / flexible_area)
+        area_efficiency = calculate_area_efficiency(flexible_area, standard_pallet.area)
         combined_score = (1.0 - area_efficiency) * 1000 + flexible_ratio_score
-        candidates_to_compare.append(("flexible", flexible_arrangement, flexible_area, combined_score, flexible_rows, flexible_columns))
+        best_name = "flexible"
+        best_arrangement = flexible_arrangement
+        best_area = flexible_area
+        best_score = combined_score
+        best_rows = flexible_rows
+        best_columns = flexible_columns
         print(f"  Flexible algorithm: SUCCESS with {flexible_rows} rows x {flexible_columns} columns, area: {flexible_area:.2f}, efficiency: {area_efficiency:.3f}")
     else:
         print("  Flexible algorithm: FAILED")
@@ -74,34 +87,36 @@ def find_best_arrangement(box: Box, box_count: int) -> Tuple[List[List[str]], in
         smart_rows = len(smart_arrangement)
         smart_columns = len(smart_arrangement[0]) if smart_rows > 0 else 0
         smart_ratio_score = ratio_score(smart_rows, smart_columns)
-        area_efficiency = min(smart_area / standard_pallet.area, standard_pallet.area / smart_area)
+        area_efficiency = calculate_area_efficiency(smart_area, standard_pallet.area)
         combined_score = (1.0 - area_efficiency) * 1000 + smart_ratio_score
-        candidates_to_compare.append(("smart", smart_arrangement, smart_area, combined_score, smart_rows, smart_columns))
+        if best_arrangement is None or combined_score < best_score:
+            best_name = "smart"
+            best_arrangement = smart_arrangement
+            best_area = smart_area
+            best_score = combined_score
+            best_rows = smart_rows
+            best_columns = smart_columns
         print(f"  Smart patterns: SUCCESS with {smart_rows} rows x {smart_columns} columns, area: {smart_area:.2f}, efficiency: {area_efficiency:.3f}")
     else:
         print("  Smart patterns: FAILED")
     
-    # Initialize best
-    if candidates_to_compare:
-        # Pick the best candidate (smart patterns have priority)
-        best_candidate = min(candidates_to_compare, key=lambda x: x[3])  # Sort by combined score
-        _, best_arrangement, best_area, best_score, best_rows, best_columns = best_candidate
-        print(f"Using {best_candidate[0]} algorithm as best solution so far")
-    else:
-        best_arrangement = None
-        best_area = None
-        best_score = float('inf')
-        best_rows = 0
-        best_columns = 0
+    if best_name is not None:
+        print(f"Using {best_name} algorithm as best solution so far")
     
     # Only try traditional grid methods if no smart patterns worked, or if they might be better
     print("Trying traditional grid arrangements...")
     traditional_tried = 0
     
+    # Every column of a candidate grid holds at least one box, so grids with
+    # more columns than fit side by side are known to fail
+    max_columns = standard_pallet.width_units // box.width_units
+    
     for rows, columns in candidates:
-        arrangement = try_arrangement(rows, columns, box, box_count, standard_pallet)
+        arrangement = None
+        if columns <= max_columns:
+            arrangement = try_arrangement(rows, columns, box, box_count, standard_pallet)
         if arrangement is None:
-            print(f"  Failed: {rows} rows x {columns} columns")
+            logger.debug("  Failed: %d rows x %d columns", rows, columns)
             continue
             
         traditional_tried += 1
@@ -109,26 +124,28 @@ def find_best_arrangement(box: Box, box_count: int) -> Tuple[List[List[str]], in
         ratio_score_val = ratio_score(rows, columns)
         
         # Calculate how close this arrangement's area is to the standard pallet area
-        area_efficiency = min(area / standard_pallet_area, standard_pallet_area / area)
+        area_efficiency = calculate_area_efficiency(area, standard_pallet_area)
         
         # Combined score: prioritize area efficiency first, then ratio score
         combined_score = (1.0 - area_efficiency) * 1000 + ratio_score_val
         
-        print(f"  Traditional: {rows} rows x {columns} columns, area: {area:.2f}, efficiency: {area_efficiency:.3f}, score: {combined_score:.1f}")
+        logger.debug("  Traditional: %d rows x %d columns, area: %.2f, efficiency: %.3f, score: %.1f",
+                     rows, columns, area, area_efficiency, combined_score)
         
         # Only replace smart pattern if traditional is significantly better
         # Add a penalty to traditional methods to prefer smart patterns
         traditional_score = combined_score + 50  # Penalty for traditional methods
         
-        if traditional_score < best_score:
-            print(f"    Traditional method beats smart patterns! Updating best solution.")
+        if best_arrangement is None or traditional_score < best_score:
+            logger.debug("    Traditional method beats smart patterns! Updating best solution.")
             best_arrangement = arrangement
             best_area = area
             best_score = combined_score  # Use actual score, not penalized
             best_rows = rows
             best_columns = columns
         else:
-            print(f"    Smart pattern remains better (smart: {best_score:.1f} vs traditional: {traditional_score:.1f})")
+            logger.debug("    Smart pattern remains better (smart: %.1f vs traditional: %.1f)",
+                         best_score, traditional_score)
     
     if traditional_tried == 0:
         print("  No traditional arrangements worked")
@@ -167,6 +184,47 @@ def find_best_arrangement(box: Box, box_count: int) -> Tuple[List[List[str]], in
     return best_arrangement, best_rows, best_columns, standard_pallet
 
 
+def evaluate_box_count(box: Box, box_count: int, pallet: Pallet,
+                       try_grid: bool = True) -> Optional[List[List[str]]]:
+    """
+    Find the best arrangement for one box count during auto-optimization.
+    
+    Each box count is evaluated independently of the others, so this only
+    depends on its arguments; the caller decides which count wins.
+    
+    Args:
+        box: Box instance with dimensions
+        box_count: Number of boxes to arrange
+        pallet: Pallet the arrangement must fit on
+        try_grid: Whether to run the traditional grid algorithm as well
+        
+    Returns:
+        The arrangement with the better area efficiency, or None if neither
+        algorithm found one
+    """
+    pallet_area = pallet.area
+    
+    # Try both the original algorithm and the flexible algorithm
+    arrangement = None
+    if try_grid:
+        arrangement = find_best_arrangement_with_custom_pallet(box, box_count, pallet)
+    
+    # Also try the flexible algorithm
+    flexible_arrangement = try_flexible_arrangement(box, box_count, pallet)
+    
+    # Choose the better arrangement
+    if arrangement is not None and flexible_arrangement is not None:
+        # Both work, choose the one with better area efficiency
+        area1 = calculate_arrangement_area(arrangement, box)
+        area2 = calculate_arrangement_area(flexible_arrangement, box)
+        efficiency1 = calculate_area_efficiency(area1, pallet_area)
+        efficiency2 = calculate_area_efficiency(area2, pallet_area)
+        return flexible_arrangement if efficiency2 > efficiency1 else arrangement
+    if flexible_arrangement is not None:
+        return flexible_arrangement
+    return arrangement
+
+
 def auto_optimize_box_count(box: Box) -> Tuple[List[List[str]], int, int, int, Pallet]:
     """
     Automatically find the optimal number of boxes per layer.
@@ -196,13 +254,13 @@ def auto_optimize_box_count(box: Box) -> Tuple[List[List[str]], int, int, int, P
     
     print(f"Theoretical maximum boxes by area: {theoretical_max}")
     
-    # Initialize tracking variables
-    best_arrangement = None
-    best_rows = 0
-    best_columns = 0
-    best_count = 0
-    best_pallet = Pallet()
-    best_score = float('inf')  # Combined score considering efficiency and area utilization
+    # Pallets are never resized in place, so one standard pallet serves
+    # every box count
+    pallet = Pallet()
+    
+    # Box counts that fit, with their arrangements, scored after the sweep
+    found_counts = []
+    found_arrangements = []
     
     standard_pallet_area = PALLET_WIDTH * PALLET_LENGTH
     
@@ -212,73 +270,68 @@ def auto_optimize_box_count(box: Box) -> Tuple[List[List[str]], int, int, int, P
     
     print(f"Testing box counts from {min_boxes} to {max_boxes}...")
     
+    # Screen every traditional grid in the search range in one vectorized pass;
+    # counts without a surviving grid can skip the traditional algorithm
+    screened_grids = screen_grid_candidates(box, pallet, min_boxes, max_boxes)
+    grid_box_counts = set(screened_grids[:, 0].tolist())
+    last_grid_count = max(grid_box_counts, default=0)
+    
+    # Boxes never overlap, so a count whose combined box area exceeds the
+    # pallet can only succeed through a screened traditional grid
+    box_area_units = box.width_units * box.length_units
+    pallet_area_units = pallet.width_units * pallet.length_units
+    
     for box_count in range(min_boxes, max_boxes + 1):
+        if box_count > last_grid_count and box_count * box_area_units > pallet_area_units:
+            # Both conditions hold for every larger count as well
+            logger.debug("  %d-%d boxes: SKIPPED - total box area exceeds the pallet", box_count, max_boxes)
+            break
+        
         try:
-            # Try both the original algorithm and the flexible algorithm
-            arrangement = find_best_arrangement_with_custom_pallet(box, box_count, Pallet())
-            
-            # Also try the flexible algorithm
-            flexible_arrangement = try_flexible_arrangement(box, box_count, Pallet())
-            
-            # Choose the better arrangement
-            best_for_this_count = None
-            if arrangement is not None and flexible_arrangement is not None:
-                # Both work, choose the one with better area efficiency
-                area1 = calculate_arrangement_area(arrangement, box)
-                area2 = calculate_arrangement_area(flexible_arrangement, box)
-                efficiency1 = min(area1 / standard_pallet_area, standard_pallet_area / area1)
-                efficiency2 = min(area2 / standard_pallet_area, standard_pallet_area / area2)
-                best_for_this_count = flexible_arrangement if efficiency2 > efficiency1 else arrangement
-            elif flexible_arrangement is not None:
-                best_for_this_count = flexible_arrangement
-            elif arrangement is not None:
-                best_for_this_count = arrangement
+            best_for_this_count = evaluate_box_count(box, box_count, pallet,
+                                                     box_count in grid_box_counts)
             
             if best_for_this_count is not None:
                 # Found arrangement with original pallet
-                rows = len(best_for_this_count)
-                columns = len(best_for_this_count[0]) if rows > 0 else 0
-                
-                # Calculate arrangement area
-                from utils.geometry import calculate_arrangement_area
-                arrangement_area = calculate_arrangement_area(best_for_this_count, box)
-                
-                # Calculate area efficiency (how close to using full pallet)
-                area_efficiency = min(arrangement_area / standard_pallet_area, 
-                                    standard_pallet_area / arrangement_area)
-                
-                # Calculate box density (boxes per unit area)
-                box_density = box_count / arrangement_area
-                
-                # Combined score: prioritize high area efficiency and high box count
-                # Lower score is better
-                score = (1.0 - area_efficiency) * 1000 - box_count
-                
-                print(f"  {box_count} boxes: SUCCESS with original pallet ({rows}x{columns}), area efficiency: {area_efficiency:.3f}, score: {score:.2f}")
-                
-                if score < best_score:
-                    best_arrangement = best_for_this_count
-                    best_rows = rows
-                    best_columns = columns
-                    best_count = box_count
-                    best_pallet = Pallet()
-                    best_score = score
+                found_counts.append(box_count)
+                found_arrangements.append(best_for_this_count)
             else:
-                print(f"  {box_count} boxes: FAILED - doesn't fit on original pallet")
+                logger.debug("  %d boxes: FAILED - doesn't fit on original pallet", box_count)
         except Exception as e:
-            print(f"  {box_count} boxes: ERROR - {e}")
+            logger.warning("%d boxes: ERROR - %s", box_count, e)
             continue
     
-    if best_arrangement is None:
+    if not found_arrangements:
         raise ValueError("Could not find any viable arrangement during auto-optimization")
     
+    # Score every successful count at once
+    counts = np.array(found_counts)
+    areas = np.array([calculate_arrangement_area(arrangement, box)
+                      for arrangement in found_arrangements])
+    
+    # Area efficiency: how close each arrangement comes to using the full pallet
+    efficiencies = np.minimum(areas / standard_pallet_area, standard_pallet_area / areas)
+    
+    # Combined score: prioritize high area efficiency and high box count
+    # Lower score is better; argmin keeps the smallest count among ties
+    scores = (1.0 - efficiencies) * 1000 - counts
+    best_index = int(np.argmin(scores))
+    
+    if logger.isEnabledFor(logging.DEBUG):
+        for box_count, arrangement, area_efficiency, score in zip(
+                found_counts, found_arrangements, efficiencies, scores):
+            logger.debug("  %d boxes: SUCCESS with original pallet (%dx%d), area efficiency: %.3f, score: %.2f",
+                         box_count, len(arrangement), len(arrangement[0]), area_efficiency, score)
+    
+    best_arrangement = found_arrangements[best_index]
+    best_count = found_counts[best_index]
+    best_rows = len(best_arrangement)
+    best_columns = len(best_arrangement[0]) if best_rows > 0 else 0
+    
     print(f"\\nOptimal solution: {best_count} boxes per layer")
     print(f"Arrangement: {best_rows} rows x {best_columns} columns")
     
-    # Calculate final efficiency for display
-    from utils.geometry import calculate_arrangement_area
-    final_area = calculate_arrangement_area(best_arrangement, box)
-    area_efficiency = min(final_area / standard_pallet_area, standard_pallet_area / final_area)
-    print(f"Area efficiency: {area_efficiency:.3f} (closer to 1.0 is better)")
+    # Efficiency of the chosen arrangement for display
+    print(f"Area efficiency: {efficiencies[best_index]:.3f} (closer to 1.0 is better)")
     
-    return best_arrangement, best_rows, best_columns, best_count, best_pallet
+    return best_arrangement, best_rows, best_columns, best_count, pallet
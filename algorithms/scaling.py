@@ -5,11 +5,34 @@ This module handles automatic pallet scaling when arrangements
 don't fit within the standard pallet dimensions.
 """
 
+import logging
 from typing import Tuple, List
 from models import Box, Pallet
-from .arrangement import find_best_arrangement_with_custom_pallet
+from .arrangement import find_best_arrangement_with_custom_pallet, try_smart_patterns
+from utils.geometry import calculate_arrangement_area
 from config import PALLET_WIDTH, PALLET_LENGTH, DEFAULT_SCALE_INCREMENT, MAX_SCALE_FACTOR
 
+logger = logging.getLogger(__name__)
+
+
+def _too_small_for_boxes(pallet: Pallet, box: Box, box_count: int) -> bool:
+    """
+    Check whether a pallet is smaller than the boxes' combined area.
+    
+    Boxes never overlap and every arrangement the scaling searches accept
+    holds all of them, so such a pallet can be skipped without searching it.
+    
+    Args:
+        pallet: Pallet to check
+        box: Box instance with dimensions
+        box_count: Number of boxes to arrange
+        
+    Returns:
+        True if the boxes cannot fit on the pallet (compared in fixed-point units)
+    """
+    return (pallet.width_units * pallet.length_units <
+            box_count * box.width_units * box.length_units)
+
 
 def find_best_arrangement_with_scaling(box: Box, box_count: int) -> Tuple[List[List[str]], int, int, Pallet]:
     """
@@ -43,7 +66,12 @@ def find_best_arrangement_with_scaling(box: Box, box_count: int) -> Tuple[List[L
         # Calculate new pallet dimensions maintaining the original ratio
         current_pallet = original_pallet.scale(scale_factor)
         
-        print(f"\\nTrying pallet size: {current_pallet.width:.1f} x {current_pallet.length:.1f} (scale: {scale_factor:.1f}x)")
+        if _too_small_for_boxes(current_pallet, box, box_count):
+            scale_factor += scale_increment
+            continue
+        
+        logger.debug("Trying pallet size: %.1f x %.1f (scale: %.1fx)",
+                     current_pallet.width, current_pallet.length, scale_factor)
         
         # Try to find arrangement with current pallet size
         arrangement = find_best_arrangement_with_custom_pallet(box, box_count, current_pallet)
@@ -56,7 +84,8 @@ def find_best_arrangement_with_scaling(box: Box, box_count: int) -> Tuple[List[L
                 print(f"SUCCESS! Found arrangement with pallet size: {current_pallet.width:.1f} x {current_pallet.length:.1f}")
                 return arrangement, rows, columns, current_pallet
             else:
-                print(f"  Arrangement found but rejected: {rows} rows x {columns} columns (width > height)")
+                logger.debug("  Arrangement found but rejected: %d rows x %d columns (width > height)",
+                             rows, columns)
                 arrangement = None
         
         scale_factor += scale_increment
@@ -68,9 +97,11 @@ def find_best_arrangement_fine_scaling(box: Box, box_count: int) -> Tuple[List[L
     """
     Find the best arrangement by gradually scaling up the pallet size with fine increments.
     
-    This function tries arrangements on the standard pallet first, then increases
-    pallet dimensions by 1/16 inch (0.0625) increments to find the smallest possible
-    pallet that can accommodate the required boxes with optimal patterns.
+    This function grows the standard pallet in 1/16 inch (0.0625) increments
+    to find the smallest possible pallet that can accommodate the required
+    boxes with optimal patterns. Sizes are walked as a staircase (shorter
+    while the boxes fit, wider once they don't), so only the boundary
+    between fitting and failing sizes is searched.
     
     Args:
         box: Box instance with dimensions
@@ -83,9 +114,6 @@ def find_best_arrangement_fine_scaling(box: Box, box_count: int) -> Tuple[List[L
         - columns: Number of columns in final arrangement  
         - final_pallet: Pallet instance used for the arrangement
     """
-    from .arrangement import try_smart_patterns, find_best_arrangement_with_custom_pallet
-    from utils.geometry import calculate_arrangement_area
-    
     original_pallet = Pallet()
     increment = 0.0625  # 1/16 inch
     max_additional_size = 8.0  # Don't go more than 8 inches larger
@@ -95,62 +123,70 @@ def find_best_arrangement_fine_scaling(box: Box, box_count: int) -> Tuple[List[L
     
     best_arrangement = None
     best_pallet = None
-    best_area = float('inf')
+    best_area_units = None  # Pallet area of the best solution, fixed-point
     best_rows = 0
     best_columns = 0
     
-    # Start with standard size and incrementally increase
-    width_increment = 0.0
-    while width_increment <= max_additional_size:
-        length_increment = 0.0
-        while length_increment <= max_additional_size:
-            # Create test pallet with current increments
-            test_width = original_pallet.width + width_increment
-            test_length = original_pallet.length + length_increment
-            test_pallet = Pallet(test_width, test_length)
-            
-            print(f"\\nTrying pallet size: {test_pallet.width:.3f} x {test_pallet.length:.3f} (+{width_increment:.3f}, +{length_increment:.3f})")
-            
-            # Try smart patterns first (faster and often better)
-            arrangement = try_smart_patterns(box, box_count, test_pallet)
-            
-            # If smart patterns don't work, try traditional method
-            if arrangement is None:
-                arrangement = find_best_arrangement_with_custom_pallet(box, box_count, test_pallet)
-            
-            if arrangement is not None:
-                rows = len(arrangement)
-                columns = len(arrangement[0]) if rows > 0 else 0
-                area = calculate_arrangement_area(arrangement, box)
-                pallet_area = test_pallet.area
-                
-                print(f"  SUCCESS! Found arrangement: {rows}x{columns}, area used: {area:.2f}, pallet area: {pallet_area:.2f}")
-                
-                # Prioritize arrangements that use pallet area most efficiently
-                # (closest to actual arrangement area)
-                area_efficiency = area / pallet_area
-                
-                # If this is better (smaller pallet area, or same area but better efficiency)
-                if pallet_area < best_area or (abs(pallet_area - best_area) < 1e-6 and area_efficiency > (best_area / best_pallet.area if best_pallet else 0)):
-                    best_arrangement = arrangement
-                    best_pallet = test_pallet
-                    best_area = pallet_area
-                    best_rows = rows
-                    best_columns = columns
-                    
-                    # If we found something on standard pallet, use it immediately
-                    if width_increment == 0.0 and length_increment == 0.0:
-                        print(f"  Perfect fit on standard pallet!")
-                        return best_arrangement, best_rows, best_columns, best_pallet
-                    
-                    # If we found a close fit (within 1 inch), consider stopping
-                    if width_increment <= 1.0 and length_increment <= 1.0:
-                        print(f"  Good fit found, but continuing to check for better options...")
-            else:
-                print(f"  Failed to fit {box_count} boxes")
-            
-            length_increment += increment
-        width_increment += increment
+    # Walk the staircase of smallest fitting pallets: start at the standard
+    # width with the longest length, shorten the pallet while it fits and
+    # widen it once it doesn't. As a pallet that fits keeps fitting when it
+    # grows, this reaches every width's shortest fitting length in at most
+    # two passes over the increments instead of trying every size
+    max_steps = int(max_additional_size / increment)
+    width_step = 0
+    length_step = max_steps
+    while width_step <= max_steps and length_step >= 0:
+        width_increment = width_step * increment
+        length_increment = length_step * increment
+        test_pallet = Pallet(original_pallet.width + width_increment,
+                             original_pallet.length + length_increment)
+        pallet_area_units = test_pallet.width_units * test_pallet.length_units
+        
+        # This size can't beat the best pallet, but shorter ones might
+        if best_area_units is not None and pallet_area_units >= best_area_units:
+            length_step -= 1
+            continue
+        
+        # Too small to hold the boxes: only a wider pallet can help
+        if _too_small_for_boxes(test_pallet, box, box_count):
+            width_step += 1
+            continue
+        
+        logger.debug("Trying pallet size: %.3f x %.3f (+%.3f, +%.3f)",
+                     test_pallet.width, test_pallet.length, width_increment, length_increment)
+        
+        # Try smart patterns first (faster and often better)
+        arrangement = try_smart_patterns(box, box_count, test_pallet)
+        
+        # If smart patterns don't work, try traditional method
+        if arrangement is None:
+            arrangement = find_best_arrangement_with_custom_pallet(box, box_count, test_pallet)
+        
+        if arrangement is None:
+            logger.debug("  Failed to fit %d boxes", box_count)
+            width_step += 1
+            continue
+        
+        rows = len(arrangement)
+        columns = len(arrangement[0]) if rows > 0 else 0
+        area = calculate_arrangement_area(arrangement, box)
+        
+        logger.debug("  SUCCESS! Found arrangement: %dx%d, area used: %.2f, pallet area: %.2f",
+                     rows, columns, area, test_pallet.area)
+        
+        # Sizes that can't beat the best are skipped above, so this one is
+        # the smallest pallet so far
+        best_arrangement = arrangement
+        best_pallet = test_pallet
+        best_area_units = pallet_area_units
+        best_rows = rows
+        best_columns = columns
+        
+        if test_pallet.is_standard_size:
+            print(f"  Perfect fit on standard pallet!")
+            return best_arrangement, best_rows, best_columns, best_pallet
+        
+        length_step -= 1
     
     if best_arrangement is not None:
         size_increase = (best_pallet.width - original_pallet.width, best_pallet.length - original_pallet.length)
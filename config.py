@@ -11,6 +11,9 @@ PALLET_LENGTH: float = 48.0   # Standard pallet length in inches
 TARGET_RATIO: float = 6.0 / 5.0  # Target rows/columns ratio (length/width) for optimal stability
 PALLET_RATIO: float = PALLET_WIDTH / PALLET_LENGTH  # 0.83 for maintaining proportions during scaling
 
+# Fixed-point configuration
+DIMENSION_SCALE: int = 16000  # Integer units per inch; 0.001" inputs and 1/16" steps convert without rounding
+
 # Scaling configuration
 DEFAULT_SCALE_INCREMENT: float = 0.1  # Increment for pallet scaling
 MAX_SCALE_FACTOR: float = 3.0        # Maximum scale factor allowed
@@ -18,6 +18,7 @@ Author: Ryne Crabtree
 Date: July 2025
 """
 
+import logging
 import sys
 from typing import Optional
 from utils import (
@@ -41,9 +42,9 @@ def main() -> None:
             # Get user input
             try:
                 box, box_count = get_user_input()
-            except (ValueError, KeyboardInterrupt) as e:
-                if isinstance(e, KeyboardInterrupt):
-                    raise
+            except KeyboardInterrupt:
+                raise
+            except ValueError as e:
                 print(f"Invalid input: {e}")
                 print("Please try again.")
                 continue
@@ -96,4 +97,11 @@ def main() -> None:
 
 
 if __name__ == "__main__":
+    # The algorithms log their search progress at debug level, shown with
+    # --verbose; warnings such as a box count that failed with an error
+    # during auto-optimization are always shown
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if "--verbose" in sys.argv[1:]:
+        logging.getLogger("algorithms").setLevel(logging.DEBUG)
+    
     main()
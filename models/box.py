@@ -6,6 +6,7 @@ validation, and orientation logic.
 """
 
 from typing import Tuple
+from .units import ceil_units
 
 
 class Box:
@@ -16,6 +17,8 @@ class Box:
     Provides methods for calculating area and handling rotations.
     """
     
+    __slots__ = ('width', 'length', 'area', 'aspect_ratio', 'width_units', 'length_units')
+    
     def __init__(self, width: float, length: float):
         """
         Initialize a box with width and length dimensions.
@@ -27,13 +30,24 @@ class Box:
         Raises:
             ValueError: If dimensions are invalid (negative or zero)
             
-        Note: If width > length, dimensions will be automatically swapped
-              and a warning will be displayed.
+        Note: If width > length, dimensions will be automatically swapped.
+              Telling the user about the swap is left to the caller.
         """
         if width <= 0 or length <= 0:
             raise ValueError("Box dimensions must be positive")
         
         self.width, self.length = self._validate_dimensions(width, length)
+        
+        # Dimensions are fixed after construction, so derived values are
+        # computed once instead of on every access in the search loops
+        self.area = self.width * self.length
+        self.aspect_ratio = self.length / self.width
+        
+        # Fixed-point copies of the dimensions for the fit checks. Boxes round
+        # up, so a box is never treated as smaller than it is (and any
+        # positive dimension is at least one unit)
+        self.width_units = ceil_units(self.width)
+        self.length_units = ceil_units(self.length)
     
     def _validate_dimensions(self, width: float, length: float) -> Tuple[float, float]:
         """
@@ -47,23 +61,10 @@ class Box:
             Tuple of (validated_width, validated_length)
         """
         if width > length:
-            print(f"WARNING: You entered width ({width}) > length ({length}).")
-            print("Automatically swapping them so width is the shorter dimension.")
             width, length = length, width
-            print(f"Corrected dimensions: width = {width}, length = {length}")
         
         return width, length
     
-    @property
-    def area(self) -> float:
-        """Calculate and return the area of the box."""
-        return self.width * self.length
-    
-    @property
-    def aspect_ratio(self) -> float:
-        """Calculate and return the aspect ratio (length/width)."""
-        return self.length / self.width if self.width > 0 else 0
-    
     def get_dimensions_for_orientation(self, orientation: str) -> Tuple[float, float]:
         """
         Get the effective width and height for a given orientation.
@@ -125,10 +126,9 @@ class Box:
             raise ValueError(f"Box doesn't fit in space {available_width}x{available_height}")
         
         if normal_fits and rotated_fits:
-            # Both orientations fit, choose the one with better space utilization
-            normal_efficiency = (self.width * self.length) / (available_width * available_height)
-            rotated_efficiency = (self.length * self.width) / (available_width * available_height)
-            return 'N' if normal_efficiency >= rotated_efficiency else 'R'
+            # Both orientations fit and cover the same area, so align the box's
+            # long side (length) with the longer side of the available space
+            return 'N' if available_height >= available_width else 'R'
         
         return 'N' if normal_fits else 'R'
     
@@ -144,8 +144,9 @@ class Box:
         """Check equality with another box."""
         if not isinstance(other, Box):
             return False
-        return self.width == other.width and self.length == other.length
+        return (self.width_units == other.width_units and
+                self.length_units == other.length_units)
     
     def __hash__(self) -> int:
         """Hash function for use in sets and as dict keys."""
-        return hash((self.width, self.length))
+        return hash((self.width_units, self.length_units))
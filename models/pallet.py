@@ -6,6 +6,7 @@ area calculations, and constraint checking.
 """
 
 from config import PALLET_WIDTH, PALLET_LENGTH
+from .units import floor_units
 
 
 class Pallet:
@@ -15,6 +16,8 @@ class Pallet:
     Provides methods for calculating area and checking if arrangements fit.
     """
     
+    __slots__ = ('width', 'length', 'area', 'width_units', 'length_units')
+    
     def __init__(self, width: float = PALLET_WIDTH, length: float = PALLET_LENGTH):
         """
         Initialize a pallet with width and length dimensions.
@@ -25,11 +28,15 @@ class Pallet:
         """
         self.width = width
         self.length = length
-    
-    @property
-    def area(self) -> float:
-        """Calculate and return the area of the pallet."""
-        return self.width * self.length
+        
+        # Pallets are never resized in place (see scale()), so cache the area
+        self.area = width * length
+        
+        # Fixed-point copies of the dimensions for the fit checks. Pallets
+        # round down, so an arrangement is never accepted on space the
+        # pallet does not have
+        self.width_units = floor_units(width)
+        self.length_units = floor_units(length)
     
     @property
     def is_standard_size(self) -> bool:
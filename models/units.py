@@ -0,0 +1,39 @@
+"""
+Fixed-point conversion helpers for the Box Packer models.
+
+Box and pallet dimensions are compared in integer units of
+1/DIMENSION_SCALE inch. Conversions round towards the safe side, so a fit
+check never accepts an arrangement that overflows the pallet.
+"""
+
+import math
+from decimal import Decimal
+from config import DIMENSION_SCALE
+
+
+def ceil_units(value: float) -> int:
+    """
+    Convert a dimension to fixed-point units, rounding up.
+    
+    Args:
+        value: Dimension in inches
+        
+    Returns:
+        Smallest whole number of units not less than the dimension
+    """
+    # Go through the shortest decimal form so e.g. 0.1 is exactly 1600 units
+    # instead of rounding up from the binary float's representation error
+    return math.ceil(Decimal(str(value)) * DIMENSION_SCALE)
+
+
+def floor_units(value: float) -> int:
+    """
+    Convert a dimension to fixed-point units, rounding down.
+    
+    Args:
+        value: Dimension in inches
+        
+    Returns:
+        Largest whole number of units not greater than the dimension
+    """
+    return math.floor(Decimal(str(value)) * DIMENSION_SCALE)
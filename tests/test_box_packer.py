@@ -4,16 +4,27 @@ Unit tests for the Box Packer application.
 This module contains comprehensive tests for all major components.
 """
 
+import contextlib
+import io
 import unittest
 import sys
 import os
+import numpy as np
 
 # Add the parent directory to the path so we can import our modules
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models import Box, Pallet
-from utils.geometry import calculate_arrangement_area, arrangement_fits_in_pallet, ratio_score
-from algorithms.arrangement import generate_candidates, try_arrangement
+from utils.geometry import (
+    calculate_arrangement_area, calculate_area_efficiency, arrangement_fits_in_pallet,
+    make_fit_checker, ratio_score, ratio_score_vec
+)
+from algorithms.arrangement import (
+    generate_candidates, try_arrangement, try_flexible_arrangement, screen_grid_candidates,
+    find_best_arrangement_with_custom_pallet, _ColumnTotals
+)
+from algorithms.optimization import find_best_arrangement
+from algorithms.scaling import find_best_arrangement_fine_scaling
 from config import PALLET_WIDTH, PALLET_LENGTH, TARGET_RATIO
 
 
@@ -41,6 +52,13 @@ class TestBox(unittest.TestCase):
         with self.assertRaises(ValueError):
             Box(10, -5)  # Negative length
     
+    def test_box_equality_and_hash(self):
+        """Test that equal boxes compare and hash by fixed-point dimensions."""
+        box = Box(10, 20)
+        self.assertEqual(box, Box(20, 10))
+        self.assertEqual(hash(box), hash(Box(20, 10)))
+        self.assertNotEqual(box, Box(10, 21))
+    
     def test_box_orientations(self):
         """Test box orientation calculations."""
         box = Box(10, 20)
@@ -82,6 +100,10 @@ class TestBox(unittest.TestCase):
         # Should choose rotated orientation for wide spaces
         self.assertEqual(box.best_orientation_for_space(25, 15), 'R')
         
+        # When both fit, the long side should follow the longer space dimension
+        self.assertEqual(box.best_orientation_for_space(25, 30), 'N')
+        self.assertEqual(box.best_orientation_for_space(30, 25), 'R')
+        
         # Should raise error if doesn't fit
         with self.assertRaises(ValueError):
             box.best_orientation_for_space(8, 8)
@@ -135,6 +157,15 @@ class TestGeometry(unittest.TestCase):
         score = ratio_score(10, 5)
         self.assertGreater(score, 0)
     
+    def test_ratio_score_vec(self):
+        """Test that vectorized ratio scores match ratio_score."""
+        rows = np.array([6, 10, 3, 7])
+        columns = np.array([5, 5, 2, 1])
+        scores = ratio_score_vec(rows, columns)
+        
+        for r, c, score in zip(rows.tolist(), columns.tolist(), scores.tolist()):
+            self.assertEqual(score, ratio_score(r, c))
+    
     def test_arrangement_area_calculation(self):
         """Test arrangement area calculation."""
         box = Box(10, 20)
@@ -147,6 +178,26 @@ class TestGeometry(unittest.TestCase):
         # Total: 20 wide, 40 high = 800 area
         self.assertEqual(area, 800)
     
+    def test_mixed_arrangement_area_calculation(self):
+        """Test area calculation with mixed orientations and gaps."""
+        box = Box(10, 20)
+        
+        # Column 0: N over R -> 20 wide (rotated box), 30 high
+        # Column 1: R over gap -> 20 wide, 10 high
+        arrangement = [['N', 'R'], ['R', 'O']]
+        area = calculate_arrangement_area(arrangement, box)
+        
+        # Total: 40 wide, 30 high = 1200 area
+        self.assertEqual(area, 1200)
+    
+    def test_calculate_area_efficiency(self):
+        """Test area efficiency on both sides of the pallet area."""
+        self.assertEqual(calculate_area_efficiency(1920, 1920), 1.0)
+        
+        for area in [960, 1500.5, 2400, 3840]:
+            self.assertEqual(calculate_area_efficiency(area, 1920),
+                             min(area / 1920, 1920 / area))
+    
     def test_arrangement_fits_in_pallet(self):
         """Test arrangement fit checking."""
         box = Box(10, 20)
@@ -159,6 +210,39 @@ class TestGeometry(unittest.TestCase):
         # Large arrangement should not fit
         arrangement = [['N'] * 10] * 10  # 100 boxes
         self.assertFalse(arrangement_fits_in_pallet(arrangement, box, pallet))
+    
+    def test_exact_fit_with_decimal_dimensions(self):
+        """Test that decimal dimensions summing exactly to the pallet fit."""
+        # 13.3 + 13.3 + 13.3 exceeds 39.9 in binary floating point
+        box = Box(13.3, 20)
+        pallet = Pallet(39.9, 48)
+        
+        arrangement = [['N', 'N', 'N']]
+        self.assertTrue(arrangement_fits_in_pallet(arrangement, box, pallet))
+    
+    def test_fine_dimensions_do_not_overflow(self):
+        """Test that dimensions finer than a unit never round into a fit."""
+        # 4 x 10.00003 is wider than 40, even though 10.00003 is within
+        # half a fixed-point unit of 10
+        box = Box(10.00003, 12)
+        self.assertFalse(arrangement_fits_in_pallet([['N'] * 4], box, Pallet()))
+    
+    def test_make_fit_checker(self):
+        """Test that the specialised fit check matches the generic one."""
+        box = Box(10, 20)
+        pallet = Pallet(40, 45)
+        fits = make_fit_checker(box, pallet)
+        
+        arrangements = [
+            [['N', 'N']],
+            [['R', 'N'], ['R', 'O']],
+            [['N', 'N', 'N', 'N', 'N']],
+            [['N'], ['N'], ['N']],
+            [['R'], ['R'], ['R'], ['R']],
+        ]
+        for arrangement in arrangements:
+            self.assertEqual(fits(arrangement),
+                             arrangement_fits_in_pallet(arrangement, box, pallet))
 
 
 class TestArrangement(unittest.TestCase):
@@ -191,6 +275,62 @@ class TestArrangement(unittest.TestCase):
         # Should not be able to arrange 100 boxes in 10x10 on standard pallet
         arrangement = try_arrangement(10, 10, box, 100, pallet)
         self.assertIsNone(arrangement)
+    
+    def test_try_arrangement_returns_independent_grids(self):
+        """Test that repeated calls don't share the returned grid."""
+        box = Box(10, 20)
+        pallet = Pallet(50, 50)
+        
+        first = try_arrangement(2, 2, box, 4, pallet)
+        first[0][0] = 'O'
+        
+        second = try_arrangement(2, 2, box, 4, pallet)
+        self.assertEqual(second[0][0], 'N')
+    
+    def test_screen_grid_candidates(self):
+        """Test that vectorized grid screening agrees with try_arrangement."""
+        box = Box(8, 10)
+        pallet = Pallet()
+        
+        screened = {tuple(row) for row in screen_grid_candidates(box, pallet, 1, 60).tolist()}
+        
+        for box_count in range(1, 61):
+            for rows, columns in generate_candidates(box_count):
+                fits = try_arrangement(rows, columns, box, box_count, pallet) is not None
+                self.assertEqual((box_count, rows, columns) in screened, fits)
+    
+    def test_equal_area_ties_keep_first_candidate(self):
+        """Test that arrangements with equal areas resolve by search order."""
+        # 7 x 5.6 wide in one row or 7 x 5.6 tall in one column cover the
+        # same area; the flexible search tries the single row first
+        self.assertEqual(try_flexible_arrangement(Box(5.6, 11.68), 7, Pallet()),
+                         [['N'] * 7])
+        
+        # 3x2 and 6x1 cover the same area; 3x2 has the better ratio
+        self.assertEqual(find_best_arrangement_with_custom_pallet(Box(4.13, 4.58), 6, Pallet()),
+                         [['N', 'N'], ['N', 'N'], ['N', 'N']])
+    
+    def test_flexible_arrangement_rejects_overflow(self):
+        """Test that the flexible search rejects a row just too wide to fit."""
+        self.assertIsNone(try_flexible_arrangement(Box(10.00003, 12), 4, Pallet(40, 12)))
+    
+    def test_column_totals(self):
+        """Test that incremental column totals agree with the full fit check."""
+        box = Box(10, 20)
+        pallet = Pallet(40, 45)
+        grid = [['O'] * 3 for _ in range(3)]
+        totals = _ColumnTotals(grid, box, pallet)
+        
+        moves = [(0, 0, 'N'), (1, 0, 'N'), (2, 0, 'N'), (2, 0, 'R'), (0, 1, 'R'),
+                 (1, 1, 'R'), (0, 2, 'N'), (0, 2, 'R'), (0, 2, 'O'), (2, 2, 'N')]
+        for row, col, orientation in moves:
+            expected = [line[:] for line in grid]
+            expected[row][col] = orientation
+            self.assertEqual(totals.fits_with(grid, row, col, orientation),
+                             arrangement_fits_in_pallet(expected, box, pallet))
+            
+            totals.place(grid, row, col, orientation)
+            self.assertEqual(grid, expected)
 
 
 class TestIntegration(unittest.TestCase):
@@ -219,6 +359,28 @@ class TestIntegration(unittest.TestCase):
         
         # Verify arrangement fits
         self.assertTrue(arrangement_fits_in_pallet(arrangement, box, pallet))
+    
+    def test_tiny_box_arrangement(self):
+        """Test arranging boxes smaller than one fixed-point unit."""
+        box = Box(0.00001, 0.00002)
+        
+        with contextlib.redirect_stdout(io.StringIO()):
+            arrangement, rows, columns, pallet = find_best_arrangement(box, 2)
+        
+        self.assertEqual(sum(row.count('N') + row.count('R') for row in arrangement), 2)
+        self.assertTrue(arrangement_fits_in_pallet(arrangement, box, pallet))
+    
+    def test_fine_scaling_finds_smallest_pallet(self):
+        """Test that fine scaling returns the smallest pallet that fits."""
+        box = Box(12, 16)
+        
+        with contextlib.redirect_stdout(io.StringIO()):
+            arrangement, rows, columns, pallet = find_best_arrangement_fine_scaling(box, 12)
+        
+        # 12 boxes don't fit the standard 40 x 48 pallet; widening it by
+        # 8" is the smallest size found by the full search as well
+        self.assertEqual((pallet.width, pallet.length), (48.0, 48.0))
+        self.assertTrue(arrangement_fits_in_pallet(arrangement, box, pallet))
 
 
 if __name__ == '__main__':
@@ -11,7 +11,8 @@ from .display import (
     print_optimization_results, print_manual_results
 )
 from .geometry import (
-    calculate_arrangement_area, arrangement_fits_in_pallet, ratio_score
+    calculate_arrangement_area, calculate_area_efficiency, arrangement_fits_in_pallet,
+    ratio_score, ratio_score_vec
 )
 from .visualization import show_2d_layout, show_arrangement_comparison
 
@@ -19,6 +20,7 @@ __all__ = [
     'get_user_input',
     'print_arrangement', 'print_program_header', 'print_box_info',
     'print_optimization_results', 'print_manual_results',
-    'calculate_arrangement_area', 'arrangement_fits_in_pallet', 'ratio_score',
+    'calculate_arrangement_area', 'calculate_area_efficiency', 'arrangement_fits_in_pallet',
+    'ratio_score', 'ratio_score_vec',
     'show_2d_layout', 'show_arrangement_comparison'
 ]
@@ -5,8 +5,69 @@ This module provides functions for calculating areas, ratios,
 and other geometric operations.
 """
 
-from typing import List
+from typing import Callable, Iterator, List, Tuple
+import numpy as np
 from models import Box, Pallet
+from config import TARGET_RATIO, DIMENSION_SCALE
+
+
+def _column_extents(arrangement: List[List[str]], box_width: int,
+                    box_length: int) -> Iterator[Tuple[int, int]]:
+    """
+    Yield the (width, height) of each column of an arrangement.
+    
+    Boxes are stacked column-wise, so each column is reduced on its own:
+    its width is the widest box in it and its height is the sum of the
+    stacked boxes. Counting orientations per column keeps the per-cell
+    work inside the C-level ``tuple.count``.
+    
+    Args:
+        arrangement: 2D grid showing box orientations ('N', 'R', 'O')
+        box_width: Shorter box dimension (fixed-point units)
+        box_length: Longer box dimension (fixed-point units)
+        
+    Yields:
+        Tuple of (column_width, column_height) in fixed-point units
+    """
+    for column in zip(*arrangement):
+        normal = column.count('N')
+        rotated = column.count('R')
+        
+        # Box guarantees width <= length, so a rotated box is always the
+        # widest; 'O' means empty space, no contribution to dimensions
+        if rotated:
+            width = box_length
+        elif normal:
+            width = box_width
+        else:
+            width = 0
+        
+        # Normal boxes stack by their length, rotated boxes by their width
+        yield width, normal * box_length + rotated * box_width
+
+
+def _arrangement_dimensions(arrangement: List[List[str]], box_width: int,
+                            box_length: int) -> Tuple[int, int]:
+    """
+    Calculate the overall (width, height) footprint of an arrangement.
+    
+    Args:
+        arrangement: 2D grid showing box orientations ('N', 'R', 'O')
+        box_width: Shorter box dimension (fixed-point units)
+        box_length: Longer box dimension (fixed-point units)
+        
+    Returns:
+        Tuple of (total_width, total_height) in fixed-point units
+    """
+    total_width = 0
+    total_height = 0
+    
+    for width, height in _column_extents(arrangement, box_width, box_length):
+        total_width += width
+        if height > total_height:
+            total_height = height
+    
+    return total_width, total_height
 
 
 def calculate_arrangement_area(arrangement: List[List[str]], box: Box) -> float:
@@ -22,40 +83,32 @@ def calculate_arrangement_area(arrangement: List[List[str]], box: Box) -> float:
     """
     if not arrangement or not arrangement[0]:
         return 0.0
-        
-    rows = len(arrangement)
-    columns = len(arrangement[0])
     
-    column_widths = []
-    column_heights = []
+    # Total width is the sum of column widths, height is the tallest column.
+    # Reducing in fixed-point units gives equal footprints exactly equal
+    # areas, so comparisons between arrangements never hinge on rounding
+    total_width, total_height = _arrangement_dimensions(arrangement, box.width_units, box.length_units)
     
-    # Analyze each column separately since boxes are stacked column-wise
-    for c in range(columns):
-        col_width = 0.0   # Maximum width needed for this column
-        col_height = 0.0  # Total height of stacked boxes in this column
-        
-        # Check each position in the column
-        for r in range(rows):
-            cell = arrangement[r][c]
-            if cell == 'N':
-                # Normal orientation: box_w is left-right, box_l is up-down
-                col_width = max(col_width, box.width)
-                col_height += box.length
-            elif cell == 'R':
-                # Rotated orientation: box_l is left-right, box_w is up-down
-                col_width = max(col_width, box.length)
-                col_height += box.width
-            # 'O' means empty space, no contribution to dimensions
-        
-        column_widths.append(col_width)
-        column_heights.append(col_height)
+    return total_width * total_height / DIMENSION_SCALE ** 2
+
+
+def calculate_area_efficiency(area: float, pallet_area: float) -> float:
+    """
+    Calculate how closely an arrangement's area matches the pallet area.
     
-    # Total width is sum of all column widths (side by side)
-    total_width = sum(column_widths)
-    # Total height is the maximum column height (tallest column determines overall height)
-    total_height = max(column_heights) if column_heights else 0
+    Equivalent to min(area / pallet_area, pallet_area / area), but only the
+    ratio that is at most 1 is computed.
     
-    return total_width * total_height
+    Args:
+        area: Area required by the arrangement
+        pallet_area: Area of the pallet
+        
+    Returns:
+        Efficiency between 0 and 1 (1.0 means the areas match exactly)
+    """
+    if area <= pallet_area:
+        return area / pallet_area
+    return pallet_area / area
 
 
 def arrangement_fits_in_pallet(arrangement: List[List[str]], box: Box, pallet: Pallet) -> bool:
@@ -70,36 +123,41 @@ def arrangement_fits_in_pallet(arrangement: List[List[str]], box: Box, pallet: P
     Returns:
         True if arrangement fits within pallet dimensions, False otherwise
     """
-    if not arrangement or not arrangement[0]:
-        return True
+    return make_fit_checker(box, pallet)(arrangement)
+
+
+def make_fit_checker(box: Box, pallet: Pallet) -> Callable[[List[List[str]]], bool]:
+    """
+    Build a fit check specialised for one box and pallet.
+    
+    Searches test many arrangements against the same box and pallet, so the
+    dimensions are bound once into the returned function instead of being
+    looked up on every call. The check compares in fixed-point units and
+    stops at the first column that overflows either pallet dimension.
+    
+    Args:
+        box: Box instance with dimensions
+        pallet: Pallet instance with constraints
         
-    rows = len(arrangement)
-    columns = len(arrangement[0])
-
-    column_widths = []
-    column_heights = []
-    
-    for c in range(columns):
-        col_width = 0.0
-        col_height = 0.0
-        for r in range(rows):
-            cell = arrangement[r][c]
-            if cell == 'N':
-                # Normal orientation
-                col_width = max(col_width, box.width)
-                col_height += box.length
-            elif cell == 'R':
-                # Rotated orientation
-                col_width = max(col_width, box.length)
-                col_height += box.width
-        column_widths.append(col_width)
-        column_heights.append(col_height)
-    
-    # Calculate total dimensions
-    total_width = sum(column_widths)
-    total_height = max(column_heights) if column_heights else 0
-    
-    return total_width <= pallet.width and total_height <= pallet.length
+    Returns:
+        Function taking an arrangement and returning True if it fits
+    """
+    box_width = box.width_units
+    box_length = box.length_units
+    pallet_width = pallet.width_units
+    pallet_length = pallet.length_units
+    
+    def fits(arrangement: List[List[str]]) -> bool:
+        total_width = 0
+        
+        for width, height in _column_extents(arrangement, box_width, box_length):
+            total_width += width
+            if total_width > pallet_width or height > pallet_length:
+                return False
+        
+        return True
+    
+    return fits
 
 
 def ratio_score(rows: int, columns: int) -> float:
@@ -113,10 +171,22 @@ def ratio_score(rows: int, columns: int) -> float:
     Returns:
         Score indicating deviation from target ratio (lower is better)
     """
-    from config import TARGET_RATIO
-    
     if columns == 0:
         return float('inf')
     
     actual_ratio = rows / columns
     return abs(actual_ratio - TARGET_RATIO)
+
+
+def ratio_score_vec(rows: np.ndarray, columns: np.ndarray) -> np.ndarray:
+    """
+    Vectorized ratio_score for many (rows, columns) pairs at once.
+    
+    Args:
+        rows: Array of row counts
+        columns: Array of column counts (must be non-zero)
+        
+    Returns:
+        Array of scores indicating deviation from target ratio (lower is better)
+    """
+    return np.abs(rows / columns - TARGET_RATIO)
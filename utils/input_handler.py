@@ -62,6 +62,10 @@ def get_user_input() -> Tuple[Box, Optional[int]]:
     
     # Box class will handle dimension validation and swapping if needed
     box = Box(width, length)
+    if width > length:
+        print(f"WARNING: You entered width ({width}) > length ({length}).")
+        print("Automatically swapping them so width is the shorter dimension.")
+        print(f"Corrected dimensions: width = {box.width}, length = {box.length}")
     
     # Get box count with validation
     while True:
@@ -2,11 +2,10 @@
 Visualization utilities for the Box Packer application.
 
 This module provides graphical 2D representations of box arrangements
-on pallets using matplotlib.
+on pallets using matplotlib. matplotlib is only imported when a plot is
+shown, so it does not slow down program startup.
 """
 
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
 from typing import List
 from models import Box, Pallet
 
@@ -30,6 +29,9 @@ def show_2d_layout(arrangement: List[List[str]], box: Box, pallet: Pallet):
         print("No arrangement to display")
         return
     
+    import matplotlib.pyplot as plt
+    import matplotlib.patches as patches
+    
     # Create figure and axis
     fig, ax = plt.subplots(1, 1, figsize=(12, 10))
     
@@ -186,6 +188,9 @@ def show_arrangement_comparison(arrangements: List[tuple], box: Box, pallet: Pal
         print("No arrangements to compare")
         return
     
+    import matplotlib.pyplot as plt
+    import matplotlib.patches as patches
+    
     num_arrangements = len(arrangements)
     fig, axes = plt.subplots(1, num_arrangements, figsize=(6 * num_arrangements, 8))
     